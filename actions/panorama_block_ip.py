@@ -31,8 +31,6 @@ class BlockIp(BaseAction):
         should_add_tag = self._param.get("should_add_tag", True)
         connector.debug_print(f"should_add_tag: {should_add_tag}")
 
-        summary = {}
-
         # Add the tag to the system: Make this optional
         if should_add_tag:
             connector.debug_print("Adding tag...")
@@ -44,10 +42,8 @@ class BlockIp(BaseAction):
                 "element": consts.TAG_ELEM.format(tag=tag, tag_comment=consts.TAG_CONTAINER_COMMENT, tag_color=consts.TAG_COLOR),
             }
 
-            status, response = connector.util._make_rest_call(data, action_result)
-            summary.update({"add_tag": response})
+            status = connector.util._queue_config_request(data, action_result, ("add_address_entry", "add_tag"))
             if phantom.is_fail(status):
-                action_result.update_summary({"add_address_entry": summary})
                 return action_result.get_status(), name
 
             connector.debug_print("Done adding tag...")
@@ -78,14 +74,11 @@ class BlockIp(BaseAction):
         }
         connector.debug_print(f"Updating address entry with data: {data}")
 
-        status, response = connector.util._make_rest_call(data, action_result)
-        summary.update({"link_tag_to_ip": response})
+        status = connector.util._queue_config_request(data, action_result, ("add_address_entry", "link_tag_to_ip"))
         if phantom.is_fail(status):
-            action_result.update_summary({"add_address_entry": summary})
             return action_result.get_status(), name
 
         connector.debug_print("Done adding address entry with param")
-        action_result.update_summary({"add_address_entry": summary})
         return phantom.APP_SUCCESS, name
 
     def execute(self, connector):
@@ -100,6 +93,7 @@ class BlockIp(BaseAction):
         # Check where the IP should go
         use_source = self._param.get(consts.PAN_JSON_SOURCE_ADDRESS, consts.PAN_DEFAULT_SOURCE_ADDRESS)
 
+        connector.util._start_config_batch()
         status, addr_name = self._add_address_entry(connector, action_result)
 
         if phantom.is_fail(status):
@@ -122,8 +116,12 @@ class BlockIp(BaseAction):
             "element": consts.ADDR_GRP_ELEM.format(addr_name=addr_name),
         }
 
-        status, response = connector.util._make_rest_call(data, action_result)
-        action_result.update_summary({"add_ip_to_address_group": response})
+        status = connector.util._queue_config_request(data, action_result, "add_ip_to_address_group")
+        if phantom.is_fail(status):
+            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("blocking ip", action_result.get_message()))
+
+        # Send the tag, address and address group updates in a single call when batching is enabled
+        status = connector.util._flush_config_batch(action_result)
         if phantom.is_fail(status):
             return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("blocking ip", action_result.get_message()))
 
@@ -113,6 +113,12 @@ class BlockUrl(BaseAction):
         major_version = connector.util._get_pan_major_version()
 
         if major_version < 9:
-            return self._block_url_8_and_below(connector, action_result)
+            status = self._block_url_8_and_below(connector, action_result)
+        else:
+            status = self._block_url_9_and_above(connector, action_result)
+
+        if phantom.is_fail(status):
+            # The calls depend on the version, which may be stale
+            connector.util._invalidate_pan_version()
 
-        return self._block_url_9_and_above(connector, action_result)
+        return status
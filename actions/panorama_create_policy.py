@@ -138,6 +138,9 @@ class CreatePolicy(BaseAction):
         else:
             return action_result.get_status()
 
+        # Missing tags are created in the same call as the policy when batching is enabled
+        connector.util._start_config_batch()
+
         if parameter.get("tag"):
             tags = [value.strip() for value in parameter.get("tag").split(",") if value.strip()]
             if tags:
@@ -147,7 +150,14 @@ class CreatePolicy(BaseAction):
                     return action_result.set_status(phantom.APP_ERROR, PAN_ERROR_MESSAGE.format("creating the tags: ", message))
                 element += tag_element_string
 
-        status, _ = self.make_rest_call_helper(connector, xpath, element, action_result)
+        if element:
+            data = {"type": "config", "action": "set", "key": connector.util._key, "xpath": xpath, "element": element}
+            status = connector.util._queue_config_request(data, action_result)
+            if phantom.is_success(status):
+                status = connector.util._flush_config_batch(action_result)
+        else:
+            connector.util._flush_config_batch(action_result)
+            status, _ = self.make_rest_call_helper(connector, xpath, element, action_result)
 
         message = action_result.get_message()
         # if nothing to modify in policy, but audit comment needs to be added or it has to be enabled
@@ -0,0 +1,51 @@
+# File: panorama_get_job_status.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import phantom.app as phantom
+from phantom.action_result import ActionResult
+
+import panorama_consts as consts
+from actions import BaseAction
+
+
+class GetJobStatus(BaseAction):
+    def execute(self, connector):
+        connector.debug_print("starting get job status action")
+        action_result = connector.add_action_result(ActionResult(dict(self._param)))
+
+        job_id = str(self._param[consts.PAN_JSON_JOB_ID]).strip()
+
+        status_action_result, job = connector.util._show_jobs([job_id])[job_id]
+        if phantom.is_fail(status_action_result.get_status()):
+            return action_result.set_status(
+                phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("fetching the job", status_action_result.get_message())
+            )
+
+        if not isinstance(job, dict):
+            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_JOB_NOT_FOUND.format(job_id=job_id))
+
+        action_result.add_data(job)
+        action_result.update_summary({"status": job.get("status"), "result": job.get("result"), "progress": job.get("progress")})
+
+        if job.get("status") != "FIN":
+            return action_result.set_status(
+                phantom.APP_SUCCESS, consts.PAN_JOB_RUNNING.format(job_id=job_id, status=job.get("status"), progress=job.get("progress"))
+            )
+
+        try:
+            return connector.util._add_job_status(job, action_result)
+        except Exception as e:
+            error = connector.util._get_error_message_from_exception(e)
+            return action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
@@ -20,7 +20,6 @@ from datetime import datetime
 
 import phantom.app as phantom
 import phantom.rules as phrules
-import requests
 from phantom.action_result import ActionResult
 from phantom.vault import Vault
 from phantom_common import paths
@@ -72,14 +71,12 @@ class GetThreatPcap(BaseAction):
         connector.debug_print("Making rest call")
 
         try:
-            request_method = getattr(requests, method)
+            request_method = getattr(connector.util._get_session(), method)
         except AttributeError:
             return False, f"invalid method: {method}"
 
         try:
-            response = request_method(
-                connector.base_url, params=params, verify=connector.config.get(phantom.APP_JSON_VERIFY, False), timeout=consts.DEFAULT_TIMEOUT
-            )
+            response = request_method(connector.base_url, params=params, timeout=consts.DEFAULT_TIMEOUT)
         except Exception as e:
             connector.debug_print(consts.PAN_ERROR_DEVICE_CONNECTIVITY, e)
             return (
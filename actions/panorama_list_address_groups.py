@@ -26,11 +26,14 @@ class ListAddressGroup(BaseAction):
         action_result = connector.add_action_result(ActionResult(dict(self._param)))
         connector.debug_print("Starting list address groups action")
 
+        fields = connector.util._get_projection_fields(self._param)
+        xpath = consts.GET_ADDR_GRP_XPATH.format(config_xpath=connector.util._get_config_xpath(self._param))
+
         data = {
             "type": "config",
             "action": "get",
             "key": connector.util._key,
-            "xpath": consts.GET_ADDR_GRP_XPATH.format(config_xpath=connector.util._get_config_xpath(self._param)),
+            "xpath": connector.util._get_projected_xpath(xpath, fields),
         }
 
         status, _ = connector.util._make_rest_call(data, action_result)
@@ -42,7 +45,8 @@ class ListAddressGroup(BaseAction):
 
         result_data = action_result.get_data().pop()
         try:
-            result_data = result_data["address-group"].get("entry")
+            # A projected response lists the entries directly under the result
+            result_data = result_data.get("address-group", result_data).get("entry")
             if not result_data:
                 return action_result.set_status(phantom.APP_ERROR, "No address group found")
         except Exception as e:
@@ -52,6 +56,8 @@ class ListAddressGroup(BaseAction):
         if isinstance(result_data, dict):
             result_data = [result_data]
 
+        result_data = connector.util._project_entries(result_data, fields)
+
         action_result.update_summary({consts.PAN_JSON_TOTAL_ADR_GRP: len(result_data)})
         action_result.update_data(result_data)
 
@@ -27,22 +27,23 @@ class ListApps(BaseAction):
         # Add the address to the phantom address group
         data = {"type": "config", "action": "get", "key": connector.util._key, "xpath": consts.APP_LIST_XPATH}
 
-        status, _ = connector.util._make_rest_call(data, action_result)
+        # The catalog is large, so the applications are parsed one at a time instead of building the whole tree
+        status, _, applications = connector.util._make_streaming_rest_call(data, action_result, consts.APP_LIST_ENTRY_PATH)
         if phantom.is_fail(status):
             return action_result.set_status(
                 phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("retrieving list of application", action_result.get_message())
             )
 
-        # Move things around, so that result data is an array of applications
-        result_data = action_result.get_data().pop()
+        total_applications = 0
         try:
-            result_data = result_data["application"]["entry"]
+            with applications:
+                for application in applications:
+                    action_result.add_data(application)
+                    total_applications += 1
         except Exception as e:
             error = connector.util._get_error_message_from_exception(e)
             return action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
 
-        action_result.update_summary({consts.PAN_JSON_TOTAL_APPLICATIONS: len(result_data)})
-
-        action_result.update_data(result_data)
+        action_result.update_summary({consts.PAN_JSON_TOTAL_APPLICATIONS: total_applications})
 
         return action_result.set_status(phantom.APP_SUCCESS)
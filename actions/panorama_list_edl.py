@@ -27,11 +27,14 @@ class ListEdl(BaseAction):
 
         connector.debug_print("starting list edl action")
 
+        fields = connector.util._get_projection_fields(self._param)
+        xpath = consts.EDL_XPATH.format(config_xpath=connector.util._get_config_xpath(self._param))
+
         data = {
             "type": "config",
             "action": "get",
             "key": connector.util._key,
-            "xpath": consts.EDL_XPATH.format(config_xpath=connector.util._get_config_xpath(self._param)),
+            "xpath": connector.util._get_projected_xpath(xpath, fields),
         }
 
         status, _ = connector.util._make_rest_call(data, action_result)
@@ -45,7 +48,8 @@ class ListEdl(BaseAction):
         result_data = action_result.get_data().pop()
 
         try:
-            result_data = result_data["external-list"].get("entry")
+            # A projected response lists the entries directly under the result
+            result_data = result_data.get("external-list", result_data).get("entry")
             if not result_data:
                 return action_result.set_status(phantom.APP_ERROR, "No EDLs found in the device group")
         except Exception as e:
@@ -55,6 +59,8 @@ class ListEdl(BaseAction):
         if isinstance(result_data, dict):
             result_data = [result_data]
 
+        result_data = connector.util._project_entries(result_data, fields)
+
         action_result.update_summary({consts.PAN_JSON_TOTAL_EDL: len(result_data)})
         action_result.update_data(result_data)
 
@@ -13,14 +13,13 @@
 # either express or implied. See the License for the specific language governing permissions
 # and limitations under the License.
 
-import json
-
 import phantom.app as phantom
 import xmltodict
 from phantom.action_result import ActionResult
 
 import panorama_consts as consts
 from actions import BaseAction
+from panorama_records import Edl
 
 
 class ModifyEdl(BaseAction):
@@ -78,22 +77,18 @@ class ModifyEdl(BaseAction):
         existing_data = action_result.get_data()
         existing_data = existing_data.pop()
 
+        if existing_data["@total-count"] == "0":
+            return action_result.set_status(phantom.APP_ERROR, "EDL object doesn't exist"), ""
+
         try:
-            existing_data = json.dumps(existing_data)
-            existing_data = json.loads(existing_data)
+            existing_edl = Edl.from_entry(existing_data.get("entry"))
         except Exception as e:
             return action_result.set_status(
                 phantom.APP_ERROR,
                 consts.PAN_ERROR_MESSAGE.format("modifying external dynamic list", connector.util._get_error_message_from_exception(e)),
             ), ""
 
-        if existing_data["@total-count"] == "0":
-            return action_result.set_status(phantom.APP_ERROR, "EDL object doesn't exist"), ""
-
-        existing_data = existing_data.get("entry")
-
-        data_type_set = {"predefined-ip", "predefined-url", "ip", "domain", "url", "imsi", "imei"}
-        old_edl_list_type = next((data for data in existing_data["type"] if data in data_type_set), None)
+        old_edl_list_type = existing_edl.list_type
 
         # fetch edl type if updated
         if edl_list_type:
@@ -120,9 +115,7 @@ class ModifyEdl(BaseAction):
                     ),
                 ), ""
         else:
-            source = existing_data["type"][old_edl_list_type]["url"]
-            if isinstance(source, dict):
-                source = source["#text"]
+            source = existing_edl.source
 
         dict_for_xml = {"entry": {"@name": edl_name, "type": {edl_list_type: {"url": source}}}}
 
@@ -137,13 +130,8 @@ class ModifyEdl(BaseAction):
                     ),
                 ), ""
             dict_for_xml["entry"]["type"][edl_list_type]["description"] = edl_description
-        else:
-            old_description = existing_data["type"][old_edl_list_type].get("description")
-            if old_description:
-                if isinstance(old_description, dict):
-                    old_description = old_description.get("#text")
-
-                dict_for_xml["entry"]["type"][edl_list_type]["description"] = old_description
+        elif existing_edl.description:
+            dict_for_xml["entry"]["type"][edl_list_type]["description"] = existing_edl.description
 
         # check if recurring is required
         recurring_dict = {}
@@ -158,37 +146,14 @@ class ModifyEdl(BaseAction):
                         ),
                     ), ""
                 dict_for_xml["entry"]["type"][edl_list_type]["certificate-profile"] = certificate_profile
-            else:
-                certificate_profile = existing_data["type"][old_edl_list_type].get("certificate-profile")
-
-                if isinstance(certificate_profile, dict):
-                    certificate_profile = certificate_profile.get("#text")
-                if certificate_profile:
-                    dict_for_xml["entry"]["type"][edl_list_type]["certificate-profile"] = certificate_profile
-
-            valid_cfu_values = {"five-minute", "hourly", "weekly", "monthly", "daily"}
-            old_check_for_updates = ""
-            old_hour = None
-            old_day_of_week = None
-            old_day_of_month = None
-            if old_edl_list_type not in ["predefined-ip", "predefined-url"]:
-                for key in existing_data["type"][old_edl_list_type]["recurring"].keys():
-                    if key in valid_cfu_values:
-                        old_check_for_updates = key
-                        break
-
-                # fetch data for recurring params
-                if old_check_for_updates in ["weekly", "monthly", "daily"]:
-                    # fetch hour data from existing data
-                    old_hour = existing_data["type"][old_edl_list_type]["recurring"][old_check_for_updates].get("at")
-
-                    if old_check_for_updates == "weekly":
-                        # fetch day_of_week data from existing data
-                        old_day_of_week = existing_data["type"][old_edl_list_type]["recurring"][old_check_for_updates].get("day-of-week")
-
-                    elif old_check_for_updates == "monthly":
-                        # fetch day_of_week data from existing data
-                        old_day_of_month = existing_data["type"][old_edl_list_type]["recurring"][old_check_for_updates].get("day-of-month")
+            elif existing_edl.certificate_profile:
+                dict_for_xml["entry"]["type"][edl_list_type]["certificate-profile"] = existing_edl.certificate_profile
+
+            # the recurring params are only present for the check for updates values using them
+            old_check_for_updates = existing_edl.check_for_updates
+            old_hour = existing_edl.hour
+            old_day_of_week = existing_edl.day_of_week
+            old_day_of_month = existing_edl.day_of_month
 
             # if user has not provided value for check_for_updates
             if not check_for_updates:
@@ -219,8 +184,6 @@ class ModifyEdl(BaseAction):
                             ),
                         ), ""
                     hour = old_hour
-                    if isinstance(hour, dict):
-                        hour = hour.get("#text")
 
                 try:
                     hour = int(hour)
@@ -252,8 +215,6 @@ class ModifyEdl(BaseAction):
                                 ),
                             ), ""
                         day_of_week = old_day_of_week
-                        if isinstance(day_of_week, dict):
-                            day_of_week = day_of_week.get("#text")
 
                     if day_of_week not in ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]:
                         return action_result.set_status(
@@ -277,8 +238,6 @@ class ModifyEdl(BaseAction):
                                 ),
                             ), ""
                         day_of_month = old_day_of_month
-                        if isinstance(day_of_month, dict):
-                            day_of_month = day_of_month.get("#text")
                     try:
                         day_of_month = int(day_of_month)
                     except Exception:
@@ -322,34 +281,16 @@ class ModifyEdl(BaseAction):
 
             if expand_subdomain:
                 dict_for_xml["entry"]["type"][edl_list_type]["expand-domain"] = expand_subdomain
-            else:
-                expand_subdomain = existing_data["type"][old_edl_list_type].get("expand-domain")
-
-                if isinstance(expand_subdomain, dict):
-                    expand_subdomain = expand_subdomain.get("#text")
-                if expand_subdomain:
-                    dict_for_xml["entry"]["type"][edl_list_type]["expand-domain"] = expand_subdomain
+            elif existing_edl.expand_domain:
+                dict_for_xml["entry"]["type"][edl_list_type]["expand-domain"] = existing_edl.expand_domain
 
         if exception_list:
             exception_list = [x.strip() for x in exception_list.split(",")]
             exception_list = list(filter(None, exception_list))
             if exception_list:
                 dict_for_xml["entry"]["type"][edl_list_type]["exception-list"] = {"member": exception_list}
-        else:
-            exception_list = existing_data["type"][old_edl_list_type].get("exception-list", {}).get("member")
-
-            if exception_list:
-                list_data = []
-                if isinstance(exception_list, list):
-                    for data in exception_list:
-                        if isinstance(data, dict):
-                            list_data.append(data.get("#text"))
-                        else:
-                            list_data.append(data)
-                elif isinstance(exception_list, dict):
-                    list_data.append(exception_list.get("#text"))
-
-                dict_for_xml["entry"]["type"][edl_list_type]["exception-list"] = {"member": list_data}
+        elif existing_edl.exception_list:
+            dict_for_xml["entry"]["type"][edl_list_type]["exception-list"] = {"member": existing_edl.exception_list}
 
         # if its not shared group
         device_group = self._param["device_group"]
@@ -364,13 +305,8 @@ class ModifyEdl(BaseAction):
 
             if disable_override:
                 dict_for_xml["entry"]["disable-override"] = disable_override
-            else:
-                disable_override = existing_data.get("disable-override")
-
-                if isinstance(disable_override, dict):
-                    disable_override = disable_override.get("#text")
-                if disable_override:
-                    dict_for_xml["entry"]["disable-override"] = disable_override
+            elif existing_edl.disable_override:
+                dict_for_xml["entry"]["disable-override"] = existing_edl.disable_override
 
         # convert dict to xml
         element_xml = xmltodict.unparse(dict_for_xml, short_empty_elements=True)
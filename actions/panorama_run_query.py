@@ -13,13 +13,12 @@
 # either express or implied. See the License for the specific language governing permissions
 # and limitations under the License.
 
-import time
-
 import phantom.app as phantom
 from phantom.action_result import ActionResult
 
 import panorama_consts as consts
 from actions import BaseAction
+from panorama_job_poller import PanoramaJobPoller
 
 
 class RunQuery(BaseAction):
@@ -72,61 +71,116 @@ class RunQuery(BaseAction):
             "dir": direction,
         }
 
+        # The finished query jobs keep their logs, so they are reattached to whatever their status
+        job_request = {key: value for key, value in data.items() if key != "key"}
+        job_id = connector.util._find_registered_job(consts.JOB_KIND_QUERY, job_request, check_running=False)
+
+        if job_id:
+            action_result.set_status(phantom.APP_SUCCESS)
+            action_result.update_summary({"reattached_jobs": [job_id]})
+            query_result, timed_out = self._wait_for_query(connector, action_result, job_id)
+            if phantom.is_success(action_result.get_status()) or timed_out:
+                return self._add_query_summary(action_result, query_result)
+
+            # The job is gone from the device, the query is run again
+            connector.util._unregister_job(job_id)
+
+        job_id = self._submit_query(connector, action_result, data)
+        if not job_id:
+            return action_result.get_status()
+
+        connector.util._register_job(consts.JOB_KIND_QUERY, job_request, job_id)
+
+        query_result, _ = self._wait_for_query(connector, action_result, job_id)
+
+        return self._add_query_summary(action_result, query_result)
+
+    def _submit_query(self, connector, action_result, data):
+        """Send the log query, returning the id of its job (None on failure)"""
         status, response = connector.util._make_rest_call(data, action_result)
         action_result.update_summary({"run_query": response})
 
         if phantom.is_fail(status):
-            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("running query", action_result.get_message()))
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_MESSAGE.format("running query", action_result.get_message()))
+            return None
 
         # Get the job id of the query call from the result_data, also pop it since we don't need it
         # to be in the action result
         result_data = action_result.get_data()
 
         if len(result_data) == 0:
-            return action_result.set_status(
-                phantom.APP_ERROR, f"Error occurred while processing response. Details: {action_result.get_message()}"
-            )
+            action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response. Details: {action_result.get_message()}")
+            return None
 
         result_data = result_data.pop(0)
         job_id = result_data.get("job")
 
         if not job_id:
-            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            return None
 
         connector.debug_print("query job ID: ", job_id)
 
-        data = {"type": "op", "key": connector.util._key, "cmd": f"<show><query><result><id>{job_id}</id></result></query></show>"}
-
-        while True:
-            status_action_result = ActionResult()
-
-            status, _ = connector.util._make_rest_call(data, status_action_result)
+        return job_id
 
-            if phantom.is_fail(status):
-                action_result.set_status(
-                    phantom.APP_ERROR, f"Error occurred while processing response. Details: {status_action_result.get_message()}"
-                )
-                return action_result.get_status()
+    def _wait_for_query(self, connector, action_result, job_id):
+        """Poll the query job until it finishes
 
-            connector.debug_print("status", status_action_result)
-
-            # get the result_data and the job status
-            result_data = status_action_result.get_data()[0]
-            job = result_data.get("job")
-            if not job_id:
-                continue
-
-            if job.get("status", "") == "FIN":
-                if isinstance(result_data.get("log").get("logs").get("entry"), dict):
-                    result_data["log"]["logs"]["entry"] = [result_data["log"]["logs"]["entry"]]
-                action_result.add_data(result_data)
-                action_result.update_summary({"finished_job": job})
-                break
+        Returns:
+            result of the finished query, whether the job poll deadline was reached
+        """
+        data = {"type": "op", "key": connector.util._key, "cmd": f"<show><query><result><id>{job_id}</id></result></query></show>"}
+        query_result = {}
 
-            # send the % progress
-            connector.send_progress(consts.PAN_PROG_COMMIT_PROGRESS, progress=job.get("progress"))
+        def check_query_job(job_ids):
+            status_action_result = ActionResult()
 
-            time.sleep(2)
+            # The logs are parsed one at a time, the finished job can return up to MAX_QUERY_COUNT of them
+            status, response, logs = connector.util._make_streaming_rest_call(data, status_action_result, consts.QUERY_LOG_ENTRY_PATH)
+
+            # the logs of an unfinished job are not read, the connection is released when leaving the block
+            with logs:
+                if phantom.is_fail(status):
+                    action_result.set_status(
+                        phantom.APP_ERROR, f"Error occurred while processing response. Details: {status_action_result.get_message()}"
+                    )
+                    return {}
+
+                connector.debug_print("status", status_action_result)
+
+                # get the result_data and the job status, a missing job is checked again at the next interval
+                result_data = response["response"]["result"]
+                job = result_data.get("job")
+                if not job:
+                    return {job_id: None}
+
+                if job.get("status", "") == "FIN":
+                    connector.util._unregister_job(job_id)
+                    result_data["log"]["logs"]["entry"] = list(logs)
+                    action_result.add_data(result_data)
+                    action_result.update_summary({"finished_job": job})
+                    query_result.update(result_data)
+                    return {}
+
+                return {job_id: job.get("progress")}
+
+        def finish_query_job(job_ids):
+            # Stop the query on the device, nobody is waiting for its logs anymore,
+            # unless the registered job is left running for a later run to reattach to
+            if not connector.util._get_job_registry():
+                finish_data = {"type": "log", "action": "finish", "job-id": job_id, "key": connector.util._key}
+                connector.util._make_rest_call(finish_data, ActionResult())
+            connector.util._set_job_poll_timeout(action_result, job_id)
+
+        poller = PanoramaJobPoller(connector.util, check_query_job, consts.PAN_PROG_QUERY_PROGRESS, on_timeout=finish_query_job)
+        poller.add(job_id)
+        timed_out_jobs = poller.wait()
+
+        return query_result, bool(timed_out_jobs)
+
+    def _add_query_summary(self, action_result, result_data):
+        if phantom.is_fail(action_result.get_status()):
+            return action_result.get_status()
 
         try:
             action_result.update_summary({"num_logs": int(result_data["log"]["logs"]["@count"])})
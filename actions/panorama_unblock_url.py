@@ -92,6 +92,12 @@ class UnblockUrl(BaseAction):
         connector.debug_print("Getting major version of panorama")
         major_version = connector.util._get_pan_major_version()
         if major_version < 9:
-            return self._unblock_url_8_and_below(connector, action_result)
+            status = self._unblock_url_8_and_below(connector, action_result)
+        else:
+            status = self._unblock_url_9_and_above(connector, action_result)
 
-        return self._unblock_url_9_and_above(connector, action_result)
+        if phantom.is_fail(status):
+            # The calls depend on the version, which may be stale
+            connector.util._invalidate_pan_version()
+
+        return status
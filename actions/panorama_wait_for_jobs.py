@@ -0,0 +1,32 @@
+# File: panorama_wait_for_jobs.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import phantom.app as phantom
+from phantom.action_result import ActionResult
+
+import panorama_consts as consts
+from actions import BaseAction
+
+
+class WaitForJobs(BaseAction):
+    def execute(self, connector):
+        connector.debug_print("starting wait for jobs action")
+        action_result = connector.add_action_result(ActionResult(dict(self._param)))
+
+        job_ids = list(dict.fromkeys(value.strip() for value in str(self._param[consts.PAN_JSON_JOB_IDS]).split(",") if value.strip()))
+        if not job_ids:
+            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_IDS)
+
+        return connector.util._wait_for_jobs(job_ids, action_result)
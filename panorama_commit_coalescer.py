@@ -0,0 +1,147 @@
+# File: panorama_commit_coalescer.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import fcntl
+import os
+import re
+import time
+import uuid
+
+import panorama_consts as consts
+from panorama_rate_limiter import locked_json_file
+
+
+class PanoramaCommitCoalescer:
+    """Ledger of the commits requested by the actions running against the same device
+
+    Every action needing a commit records it in a ledger file of the app state directory.
+    The action holding the leader lock collects all the requests recorded during the coalescing window,
+    runs a single commit for them and publishes the outcome, which each waiting action picks up.
+    The requests taken by a leader stay in the ledger until their outcome is published, so the next leader
+    commits them again if the previous one stopped in between.
+    """
+
+    def __init__(self, state_dir, host):
+        """Create the coalescer for the given device host
+
+        :param state_dir: directory where the shared ledger file is kept
+        :param host: device host the ledger is keyed on
+        """
+        file_name = "commit_ledger_{}".format(re.sub(r"[^A-Za-z0-9_.-]", "_", host))
+        self._path = os.path.join(state_dir, f"{file_name}.json")
+        self._leader_path = os.path.join(state_dir, f"{file_name}.leader")
+        self._leader_file = None
+
+    def register(self, device_group, use_partial_commit, config_scopes=None, device_groups=None):
+        """Record a commit request
+
+        :param config_scopes: device groups (and 'shared') whose config the requesting action touched
+        :param device_groups: subset of the device groups to push for a 'shared' request, all of them when empty
+        :return: id of the request
+        """
+        request_id = uuid.uuid4().hex
+
+        with locked_json_file(self._path) as ledger:
+            ledger.setdefault("requests", {})[request_id] = {
+                "device_group": device_group,
+                "device_groups": list(device_groups or []),
+                "use_partial_commit": bool(use_partial_commit),
+                "config_scopes": list(config_scopes or []),
+                "created": time.time(),
+            }
+
+        return request_id
+
+    def withdraw(self, request_id):
+        """Remove the request if no leader has taken it yet
+
+        :return: True if the request was withdrawn, False if a leader is committing it
+        """
+        with locked_json_file(self._path) as ledger:
+            return ledger.get("requests", {}).pop(request_id, None) is not None
+
+    def get_result(self, request_id):
+        """Return the published outcome of the request, None if it is not available yet"""
+        with locked_json_file(self._path) as ledger:
+            return ledger.get("results", {}).pop(request_id, None)
+
+    def try_lead(self):
+        """Take the leader lock if no other action holds it
+
+        :return: True if the lock was taken, it must then be released with release_lead
+        """
+        leader_file = open(self._leader_path, "a")
+        try:
+            fcntl.flock(leader_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            leader_file.close()
+            return False
+
+        self._leader_file = leader_file
+        return True
+
+    def release_lead(self):
+        """Release the leader lock taken by try_lead"""
+        if self._leader_file:
+            fcntl.flock(self._leader_file, fcntl.LOCK_UN)
+            self._leader_file.close()
+            self._leader_file = None
+
+    def take_requests(self):
+        """Remove and return all the pending requests, keyed by their id
+
+        The requests are kept as taken, with the time and the pid of the leader, until their outcome is published.
+        """
+        now = time.time()
+
+        with locked_json_file(self._path) as ledger:
+            requests = ledger.get("requests", {})
+            ledger["requests"] = {}
+            taken = ledger.setdefault("taken", {})
+            taken.update({request_id: dict(request, taken=now, leader_pid=os.getpid()) for request_id, request in requests.items()})
+            return requests
+
+    def requeue_orphaned_requests(self):
+        """Put the requests taken by a previous leader back in the pending requests
+
+        It must be called with the leader lock held: the lock is released when the leader process stops,
+        so the requests still taken were left without an outcome.
+
+        :return: the requeued requests, keyed by their id
+        """
+        with locked_json_file(self._path) as ledger:
+            orphaned = ledger.pop("taken", {})
+            requests = ledger.setdefault("requests", {})
+            for request_id, request in orphaned.items():
+                requests[request_id] = {key: value for key, value in request.items() if key not in ("taken", "leader_pid")}
+            return orphaned
+
+    def publish_results(self, request_ids, result):
+        """Publish the outcome of the commit to all the given requests"""
+        now = time.time()
+
+        with locked_json_file(self._path) as ledger:
+            # The results of the actions which stopped waiting are dropped after a while
+            results = {
+                request_id: value
+                for request_id, value in ledger.get("results", {}).items()
+                if value.get("published", 0) + consts.COMMIT_COALESCE_RESULT_TTL > now
+            }
+            results.update({request_id: dict(result, published=now) for request_id in request_ids})
+            ledger["results"] = results
+
+            taken = ledger.get("taken", {})
+            for request_id in request_ids:
+                taken.pop(request_id, None)
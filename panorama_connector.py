@@ -62,6 +62,9 @@ class PanoramaConnector(BaseConnector):
         return phantom.APP_SUCCESS
 
     def finalize(self):
+        if self.util:
+            self.util._join_device_group_refresh()
+            self.util._close_session()
         if self.is_state_updated:
             # Encrypt and Save the state, this data is saved across actions and app upgrades
             self.state = self.util.encrypt_state(self.state)
@@ -90,8 +93,14 @@ class PanoramaConnector(BaseConnector):
             for action_class in base_action_sub_classes:
                 if action_class.__module__ == action_name:
                     action = action_class(param)
-                    return action.execute(self)
+                    status = action.execute(self)
+                    self.util._add_rate_limit_summary()
+                    if phantom.is_fail(status):
+                        # the tags the action created may not have been written
+                        self.util._drop_written_tag_scopes()
+                    return status
         except Exception:
+            self.util._drop_written_tag_scopes()
             return phantom.APP_ERROR
 
 
@@ -30,6 +30,18 @@ PAN_ERROR_NO_ALLOW_POLICY_ENTRIES_FOUND = (
 PAN_ERROR_NO_ALLOW_POLICY_ENTRIES_FOUND += "\nNeed atleast one such policy"
 PAN_ERROR_POLICY_NOT_PRESENT_CONFIG_DONT_CREATE = "Policy not found. Please verify that provided parameter values are correct"
 PAN_ERROR_NO_JOB_ID = "Could not find Job ID in response body"
+PAN_ERROR_UNKNOWN_DEVICE_GROUPS = "Device groups not found on the device: {}"
+PAN_ERROR_JOB_POLL_TIMEOUT = "Job {job_id} did not finish within the job poll timeout of {timeout} seconds"
+PAN_ERROR_PUSH_NOT_SUBMITTED = "Device groups {device_groups} not pushed, the job poll timeout of {timeout} seconds was reached first"
+PAN_ERROR_JOB_NOT_FOUND = "Job {job_id} not found on the device"
+PAN_ERROR_UNKNOWN_DEVICES = "Devices not found in the device groups to push: {}"
+PAN_ERROR_DEVICE_GROUP_SYNC_STATE = "Unable to fetch the devices of the device groups to push"
+PAN_ERROR_NO_JOB_IDS = "Please provide at least one job id in the 'job_ids' action parameter"
+PAN_SUCCESS_NO_PENDING_CHANGES = "No pending changes to commit and all the device groups are in sync, skipped the commit and push"
+PAN_SUCCESS_DEVICE_GROUPS_IN_SYNC = "Committed the changes, all the device groups are in sync, skipped the push"
+PAN_SUCCESS_COMMIT_JOBS_SUBMITTED = "Submitted the commit and push jobs: {}"
+PAN_JOB_RESULT = "Job {job_id} finished with result {result}"
+PAN_JOB_RUNNING = "Job {job_id} is {status}, {progress}% completed"
 PAN_ERROR_MESSAGE = "Error occurred while {}. Details: {}"
 
 PAN_PROG_USING_BASE_URL = "Using base URL '{base_url}'"
@@ -37,6 +49,7 @@ PAN_PROG_GOT_REPLY = "Got reply, parsing..."
 PAN_PROG_PARSED_REPLY = "Done"
 PAN_PROG_COMMIT_PROGRESS = "Commit completed {progress}%"
 PAN_PROG_COMMIT_ALL_PROGRESS = "Commit on device group: {device_group} completed {progress}%"
+PAN_PROG_QUERY_PROGRESS = "Query completed {progress}%"
 PAN_PROG_COMMIT_PROGRESS_PENDING = "Commit completed {progress}%, but still Pending on remote device"
 
 PAN_JSON_DEVICE_GRP = "device_group"
@@ -46,6 +59,12 @@ PAN_JSON_IP = "ip"
 PAN_JSON_TOTAL_APPLICATIONS = "total_applications"
 PAN_JSON_TOTAL_EDL = "total_external_dynamic_lists"
 PAN_JSON_TOTAL_ADR_GRP = "total_address_groups"
+PAN_JSON_FIELDS = "fields"
+PAN_JSON_DEVICE_GROUPS = "device_groups"
+PAN_JSON_WAIT_FOR_COMPLETION = "wait_for_completion"
+PAN_JSON_DEVICES = "devices"
+PAN_JSON_JOB_ID = "job_id"
+PAN_JSON_JOB_IDS = "job_ids"
 
 PAN_JSON_SEC_POLICY = "sec_policy"
 PAN_JSON_POLICY_TYPE = "policy_type"
@@ -153,15 +172,23 @@ TAG_ELEM = "<entry name='{tag}'><color>{tag_color}</color><comments>{tag_comment
 START_TAG = "<entry name='{tag}'>"
 END_TAG = "</entry>"
 TAG_COMMENT = "Tag created from Splunk SOAR"
-GET_TAG_XPATH = "{config_xpath}/tag/entry[@name='{name}']"
 ADDRESS_XPATH = "{config_xpath}/address/entry[@name='{name}']"
+# Projection selecting only the name of the entries, the device then skips every other node
+NAME_PROJECTION_XPATH = "{xpath}/@name"
+ENTRY_NAME_PROJECTION_XPATH = "{xpath}/entry/@name"
+XPATH_UNION = " | "
+ENTRY_NAME_FIELD = "name"
 
 APP_LIST_XPATH = "/config/predefined/application"
-COMMIT_ALL_DEV_GRP_DEV_CMD = "<commit-all><shared-policy>"
-COMMIT_ALL_DEV_GRP_DEV_CMD += "<device-group>"
-COMMIT_ALL_DEV_GRP_DEV_CMD += '<entry name="{device_group}"><devices><entry name="{dev_ser_num}"/></devices></entry>'
-COMMIT_ALL_DEV_GRP_DEV_CMD += "</device-group>"
-COMMIT_ALL_DEV_GRP_DEV_CMD += "</shared-policy></commit-all>"
+APP_LIST_ENTRY_PATH = "response/result/application/entry"
+QUERY_LOG_ENTRY_PATH = "response/result/log/logs/entry"
+PARTIAL_COMMIT_EXCLUDED = "<{scope}>excluded</{scope}>"
+COMMIT_ALL_DEV_GRP_CMD = "<commit-all><shared-policy>"
+COMMIT_ALL_DEV_GRP_CMD += "<device-group>{entries}</device-group>"
+COMMIT_ALL_DEV_GRP_CMD += "</shared-policy></commit-all>"
+COMMIT_ALL_DEV_GRP_ENTRY = '<entry name="{device_group}"/>'
+COMMIT_ALL_DEV_GRP_DEV_ENTRY = '<entry name="{device_group}"><devices>{devices}</devices></entry>'
+COMMIT_ALL_DEVICE_ENTRY = '<entry name="{dev_ser_num}"/>'
 
 # Constants relating to value_list check
 POLICY_TYPE_VALUE_LIST = ["pre-rulebase", "post-rulebase"]
@@ -171,6 +198,93 @@ DIRECTION_VALUE_LIST = ["backward", "forward"]
 VALUE_LIST_VALIDATION_MESSAGE = "Please provide valid input from {} in '{}' action parameter"
 
 DEFAULT_TIMEOUT = 30
+DEFAULT_CONNECTION_POOL_SIZE = 10
+DEFAULT_REQUEST_CONCURRENCY = 4
+DEFAULT_COMMIT_PARALLELISM = 1
+DEFAULT_VERSION_CACHE_TTL = 0
+DEFAULT_DEVICE_GROUP_CACHE_TTL = 0
+DEFAULT_TAG_CACHE_TTL = 0
+
+# Constants relating to the polling of the commit, push and log query jobs
+SHOW_ALL_JOBS_CMD = "<show><jobs><all/></jobs></show>"
+COMMIT_JOB_TYPE = "Commit"
+PUSH_JOB_TYPE = "CommitAll"
+
+# Constants relating to the detection of the commits and pushes with nothing to apply, and the targeting of the pushes
+CHECK_PENDING_CHANGES_CMD = "<check><pending-changes></pending-changes></check>"
+SHOW_DEVICE_GROUPS_CMD = "<show><devicegroups></devicegroups></show>"
+SHOW_DEVICE_GROUP_HIERARCHY_CMD = "<show><dg-hierarchy></dg-hierarchy></show>"
+DEVICE_GROUP_IN_SYNC = "In Sync"
+JOB_POLL_INITIAL_INTERVAL = 1
+JOB_POLL_MIN_INTERVAL = 0.5
+JOB_POLL_MAX_INTERVAL = 15
+JOB_POLL_BACKOFF_FACTOR = 1.5
+DEFAULT_JOB_POLL_TIMEOUT = 0
+
+PAN_VERSION_CACHE = "pan_version"
+DEVICE_GROUP_INVENTORY_STATE_KEY = "device_group_inventory"
+TAG_CACHE_STATE_KEY = "tag_cache"
+
+# Constants relating to the history of the commit and push durations kept in the app state
+COMMIT_HISTORY_STATE_KEY = "commit_history"
+COMMIT_HISTORY_COMMIT_KEY = "commit"
+COMMIT_HISTORY_SIZE = 50
+
+# Constants relating to the registry of the jobs reattached to by later runs
+JOB_KIND_COMMIT = "commit"
+JOB_KIND_PUSH = "push"
+JOB_KIND_QUERY = "query"
+JOB_REGISTRY_TTL = 6 * 3600
+
+# Constants relating to the coalescing of the commits requested by concurrent actions
+DEFAULT_COMMIT_COALESCE_WINDOW = 0
+DEFAULT_COMMIT_COALESCE_MAX_WAIT = 300
+COMMIT_COALESCE_POLL_INTERVAL = 1
+COMMIT_COALESCE_RESULT_TTL = 3600
+
+# Constants relating to the multi-config batching of config requests
+MULTI_CONFIG_ACTIONS = ["set", "edit", "delete"]
+MAX_MULTI_CONFIG_ELEMENT_SIZE = 256 * 1024
+
+# Constants relating to the capture of the responses in the debug data and logs
+DEBUG_CAPTURE_OFF = "off"
+DEBUG_CAPTURE_TRUNCATED = "truncated"
+DEBUG_CAPTURE_FULL = "full"
+DEBUG_CAPTURE_VALUE_LIST = [DEBUG_CAPTURE_OFF, DEBUG_CAPTURE_TRUNCATED, DEBUG_CAPTURE_FULL]
+DEFAULT_DEBUG_CAPTURE_MAX_SIZE = 4096
+DEFAULT_DEBUG_CAPTURE_SAMPLE_RATE = 100
+DEBUG_CAPTURE_TRUNCATED_MESSAGE = "... (truncated, {size} characters in total)"
+
+# Constants relating to the rate limiting of calls to the device
+DEFAULT_RATE_LIMIT_PER_SECOND = 0
+DEFAULT_MAX_IN_FLIGHT_REQUESTS = 0
+RATE_LIMIT_POLL_INTERVAL = 0.05
+RATE_LIMIT_MAX_SLEEP = 1
+RATE_LIMIT_SLOT_GRACE_PERIOD = 30
+
+# Constants relating to the circuit breaker on device connectivity
+PAN_CIRCUIT_BREAKER = "circuit_breaker"
+CIRCUIT_BREAKER_CLOSED = "closed"
+CIRCUIT_BREAKER_OPEN = "open"
+CIRCUIT_BREAKER_HALF_OPEN = "half_open"
+DEFAULT_CIRCUIT_BREAKER_THRESHOLD = 5
+DEFAULT_CIRCUIT_BREAKER_COOLDOWN = 60
+PAN_ERROR_CIRCUIT_BREAKER_OPEN = "Device appears to be unreachable after {failures} consecutive connection failures, "
+PAN_ERROR_CIRCUIT_BREAKER_OPEN += "calls are skipped for the next {remaining_time} seconds"
+
+# Constants relating to the retry of transient failures
+RETRY_CONNECTION_ERROR = "connection"
+RETRY_SERVER_ERROR = "server_error"
+RETRY_SESSION_TIMEOUT = "session_timeout"
+RETRY_ERROR_CLASS_VALUE_LIST = [RETRY_CONNECTION_ERROR, RETRY_SERVER_ERROR, RETRY_SESSION_TIMEOUT]
+DEFAULT_RETRY_ERROR_CLASSES = ", ".join(RETRY_ERROR_CLASS_VALUE_LIST)
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF_SECONDS = 1
+DEFAULT_RETRY_TIME_BUDGET = 60
+MAX_RETRY_BACKOFF_SECONDS = 30
+IDEMPOTENT_CONFIG_ACTIONS = ["get", "show"]
+IDEMPOTENT_REQUEST_TYPES = ["version", "log", "export"]
+PAN_SESSION_TIMED_OUT_CODE = "22"
 
 PAN_KEY_TOKEN = "key_token"
 PAN_ERROR_MESSAGE_UNAVAILABLE = "Error message unavailable. Please check the asset configuration and|or action parameters"
@@ -0,0 +1,115 @@
+# File: panorama_job_poller.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import time
+
+import panorama_consts as consts
+
+
+def get_progress(value):
+    """Return the progress of a job as a number, jobs report it as a string which may be missing"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PanoramaJobPoller:
+    """Waits for jobs of the device (commits, pushes, log queries) to finish
+
+    The jobs are checked together at adaptive intervals: the first check is made quickly, the interval
+    backs off while the jobs make no progress and shrinks when the progress rate shows they are about
+    to finish. The wait ends at the job_poll_timeout deadline of the asset.
+    """
+
+    def __init__(self, util, check_jobs, progress_message=consts.PAN_PROG_COMMIT_PROGRESS, on_timeout=None):
+        """Create the poller
+
+        :param util: PanoramaUtils object of the action run
+        :param check_jobs: function called with the ids of the outstanding jobs, returning a dictionary of the progress
+            of the ones still running. The jobs missing from the dictionary are done, the function reports their outcome
+        :param progress_message: message sent with the progress of the job lagging behind
+        :param on_timeout: function called with the ids of the jobs still running when the deadline is reached
+        """
+        self._connector = util._connector
+        self._check_jobs = check_jobs
+        self._progress_message = progress_message
+        self._on_timeout = on_timeout
+        self._timeout = util._get_int_config("job_poll_timeout", consts.DEFAULT_JOB_POLL_TIMEOUT)
+        self._jobs = {}
+
+    def add(self, job_id):
+        """Start tracking the job"""
+        self._jobs[job_id] = None
+
+    def _get_next_interval(self, interval, running, elapsed):
+        """Return the time to wait before the next check, given the progress of the running jobs since the last one"""
+        lagging_job_id = min(running, key=lambda job_id: get_progress(running[job_id]))
+        progress = get_progress(running[lagging_job_id])
+        previous_progress = self._jobs.get(lagging_job_id)
+
+        if previous_progress is None or progress <= previous_progress:
+            return min(interval * consts.JOB_POLL_BACKOFF_FACTOR, consts.JOB_POLL_MAX_INTERVAL)
+
+        # Wait about the time the lagging job needs to finish at its current rate
+        remaining_time = (100 - progress) * elapsed / (progress - previous_progress)
+        return max(consts.JOB_POLL_MIN_INTERVAL, min(interval, remaining_time))
+
+    def wait(self, submit_jobs=None):
+        """Check the jobs until they are all done or the deadline is reached
+
+        :param submit_jobs: function called before every check, it may submit more jobs and add them to the poller
+        :return: set of the ids of the jobs still running at the deadline, empty if they all finished
+        """
+        start_time = time.time()
+        deadline = start_time + self._timeout if self._timeout else None
+        interval = consts.JOB_POLL_INITIAL_INTERVAL
+        last_check_time = start_time
+
+        while True:
+            if submit_jobs:
+                submit_jobs()
+
+            if not self._jobs:
+                return set()
+
+            running = self._check_jobs(list(self._jobs))
+            check_time = time.time()
+
+            if running:
+                interval = self._get_next_interval(interval, running, check_time - last_check_time)
+                lagging_progress = min(get_progress(value) for value in running.values())
+                self._connector.send_progress(self._progress_message, progress=lagging_progress)
+
+            self._jobs = {job_id: get_progress(progress) for job_id, progress in running.items() if job_id in self._jobs}
+            last_check_time = check_time
+
+            if not self._jobs:
+                # Jobs waiting to be submitted are sent right away
+                continue
+
+            if deadline and check_time >= deadline:
+                timed_out_jobs = set(self._jobs)
+                self._connector.debug_print(f"Job poll deadline reached, jobs still running: {timed_out_jobs}")
+                if self._on_timeout:
+                    self._on_timeout(timed_out_jobs)
+                self._jobs = {}
+                return timed_out_jobs
+
+            # The last check is made at the deadline
+            sleep_time = min(interval, deadline - check_time) if deadline else interval
+
+            self._connector.debug_print(f"Checking the jobs {list(self._jobs)} again in {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
@@ -0,0 +1,82 @@
+# File: panorama_job_registry.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import hashlib
+import json
+import os
+import re
+import time
+
+import panorama_consts as consts
+from panorama_rate_limiter import locked_json_file
+
+
+class PanoramaJobRegistry:
+    """Registry of the jobs submitted to the device and not known to be finished
+
+    The registry lives in a file of the app state directory and is updated as soon as a job is submitted,
+    so the job survives the action run which submitted it. A later run sending the same request
+    reattaches to the registered job instead of submitting it again.
+    """
+
+    def __init__(self, state_dir, host):
+        """Create the registry for the given device host
+
+        :param state_dir: directory where the registry file is kept
+        :param host: device host the registry is keyed on
+        """
+        self._path = os.path.join(state_dir, "job_registry_{}.json".format(re.sub(r"[^A-Za-z0-9_.-]", "_", host)))
+
+    @staticmethod
+    def _get_key(kind, request):
+        """Return the key of the job sending the given request, the request must be JSON serializable"""
+        return hashlib.sha256(json.dumps([kind, request], sort_keys=True).encode()).hexdigest()
+
+    def register(self, kind, request, job_id, owner):
+        """Record the job submitted for the request
+
+        :param kind: kind of the job (commit, push, query)
+        :param request: parameters of the request which submitted the job
+        :param job_id: id of the job
+        :param owner: identifier of the action which submitted the job
+        """
+        now = time.time()
+
+        with locked_json_file(self._path) as registry:
+            jobs = {key: job for key, job in registry.get("jobs", {}).items() if job.get("submitted", 0) + consts.JOB_REGISTRY_TTL > now}
+            jobs[self._get_key(kind, request)] = {"job_id": job_id, "kind": kind, "owner": owner, "submitted": now}
+            registry["jobs"] = jobs
+
+    def find(self, kind, request, submitted_after=None):
+        """Return the registered job of the request, None if there is none
+
+        :param submitted_after: only return a job submitted after this time
+        :return: dictionary of the job_id, kind, owner and submission time of the job
+        """
+        with locked_json_file(self._path) as registry:
+            job = registry.get("jobs", {}).get(self._get_key(kind, request))
+
+        if not job or job.get("submitted", 0) + consts.JOB_REGISTRY_TTL <= time.time():
+            return None
+
+        if submitted_after and job.get("submitted", 0) < submitted_after:
+            return None
+
+        return job
+
+    def remove(self, job_id):
+        """Remove the job, once it finished or can't be reattached to"""
+        with locked_json_file(self._path) as registry:
+            registry["jobs"] = {key: job for key, job in registry.get("jobs", {}).items() if job.get("job_id") != job_id}
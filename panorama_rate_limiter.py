@@ -0,0 +1,121 @@
+# File: panorama_rate_limiter.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+
+import panorama_consts as consts
+
+
+@contextmanager
+def locked_json_file(path):
+    """Open the given JSON file under an exclusive lock shared by all the action processes
+
+    Yields the loaded dictionary, which is written back to the file when the block exits.
+    """
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(path) as json_file:
+                    data = json.load(json_file)
+            except (OSError, ValueError):
+                data = {}
+
+            if not isinstance(data, dict):
+                data = {}
+
+            yield data
+
+            with open(path, "w") as json_file:
+                json.dump(data, json_file)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PanoramaRateLimiter:
+    """Token bucket limiting the calls made to a device by all the parallel action runs
+
+    The bucket lives in a file of the app state directory, so every action process
+    running against the same device host draws from the same tokens and in-flight slots.
+    """
+
+    def __init__(self, state_dir, host, rate, max_in_flight):
+        """Create the limiter for the given device host
+
+        :param state_dir: directory where the shared bucket file is kept
+        :param host: device host the bucket is keyed on
+        :param rate: maximum number of calls per second, 0 for no limit
+        :param max_in_flight: maximum number of calls running at the same time, 0 for no limit
+        """
+        self._path = os.path.join(state_dir, "rate_limit_{}.json".format(re.sub(r"[^A-Za-z0-9_.-]", "_", host)))
+        self._rate = rate
+        self._max_in_flight = max_in_flight
+
+    def _try_acquire(self, slot_id):
+        """Take a token and an in-flight slot if available
+
+        :return: 0 if the call can proceed, otherwise the time to wait before trying again
+        """
+        now = time.time()
+
+        with locked_json_file(self._path) as bucket:
+            in_flight = {key: expiry for key, expiry in bucket.get("in_flight", {}).items() if expiry > now}
+            bucket["in_flight"] = in_flight
+
+            tokens = bucket.get("tokens", self._rate)
+            if self._rate:
+                tokens = min(self._rate, tokens + (now - bucket.get("updated", now)) * self._rate)
+                bucket["tokens"] = tokens
+                bucket["updated"] = now
+
+            if self._max_in_flight and len(in_flight) >= self._max_in_flight:
+                return min(in_flight.values()) - now if in_flight else consts.RATE_LIMIT_POLL_INTERVAL
+
+            if self._rate and tokens < 1:
+                return (1 - tokens) / self._rate
+
+            if self._rate:
+                bucket["tokens"] = tokens - 1
+
+            # The slot expires on its own if the process holding it dies before releasing it
+            in_flight[slot_id] = now + consts.DEFAULT_TIMEOUT + consts.RATE_LIMIT_SLOT_GRACE_PERIOD
+
+        return 0
+
+    def acquire(self):
+        """Wait until the call is allowed by the limiter
+
+        :return: slot id to release once the call is done, time spent waiting in seconds
+        """
+        slot_id = f"{os.getpid()}-{uuid.uuid4().hex}"
+        start_time = time.time()
+
+        while True:
+            delay = self._try_acquire(slot_id)
+            if not delay:
+                return slot_id, time.time() - start_time
+
+            time.sleep(min(max(delay, consts.RATE_LIMIT_POLL_INTERVAL), consts.RATE_LIMIT_MAX_SLEEP))
+
+    def release(self, slot_id):
+        """Release the in-flight slot taken by acquire"""
+        with locked_json_file(self._path) as bucket:
+            bucket.get("in_flight", {}).pop(slot_id, None)
@@ -0,0 +1,207 @@
+# File: panorama_records.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import datetime
+
+
+JOB_TIME_FORMATS = ("%Y/%m/%d %H:%M:%S", "%H:%M:%S")
+
+
+def as_list(value):
+    """Return the value as a list, xmltodict gives a single dictionary for a single entry"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def get_text(value):
+    """Return the text of the element, xmltodict gives a dictionary when the element has attributes"""
+    if isinstance(value, dict):
+        return value.get("#text")
+    return value
+
+
+def get_members(value):
+    """Return the texts of the <member> elements under the given element"""
+    if not isinstance(value, dict):
+        return []
+    return [text for text in (get_text(member) for member in as_list(value.get("member"))) if text is not None]
+
+
+def get_child(value, key):
+    """Return the child element of the given element, None if it is missing"""
+    if isinstance(value, dict):
+        return value.get(key)
+    return None
+
+
+def from_entries(record_class, entries):
+    """Build the records of the given class from the entries of a config get response"""
+    return [record_class.from_entry(entry) for entry in as_list(entries) if isinstance(entry, dict)]
+
+
+def parse_job_time(value, reference=None):
+    """Parse a time reported by a job, None if it is missing or malformed
+
+    The device only reports the time of day once the job was enqueued, the date is then taken from the reference time.
+    """
+    for time_format in JOB_TIME_FORMATS:
+        try:
+            parsed = datetime.datetime.strptime(value.strip(), time_format)
+        except (AttributeError, ValueError):
+            continue
+
+        if time_format == "%H:%M:%S":
+            if reference is None:
+                return None
+            parsed = datetime.datetime.combine(reference.date(), parsed.time())
+            if parsed < reference:
+                # the job went past midnight
+                parsed += datetime.timedelta(days=1)
+
+        return parsed
+
+    return None
+
+
+def get_seconds(start, end):
+    """Return the seconds between the two times, None if one of them is missing"""
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+class Record:
+    """Config entry normalized once from the xmltodict response
+
+    The attribute wrappers (@admin, @time, #text) and the single/multiple member
+    variants are resolved when the record is built, so the actions read plain values.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name, **kwargs):
+        # The records derive directly from Record, so __slots__ lists all the fields but the name
+        for slot in self.__slots__:
+            setattr(self, slot, kwargs.get(slot))
+        self.name = name
+
+    @classmethod
+    def from_entry(cls, entry):
+        return cls(entry.get("@name"))
+
+    def __repr__(self):
+        values = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in ("name", *self.__slots__))
+        return f"{type(self).__name__}({values})"
+
+
+class DeviceGroup(Record):
+    __slots__ = ("description", "devices")
+
+    @classmethod
+    def from_entry(cls, entry):
+        devices = [device.get("@name") for device in as_list(get_child(entry.get("devices"), "entry")) if isinstance(device, dict)]
+        return cls(entry.get("@name"), description=get_text(entry.get("description")), devices=devices)
+
+
+class Edl(Record):
+    __slots__ = (
+        "certificate_profile",
+        "check_for_updates",
+        "day_of_month",
+        "day_of_week",
+        "description",
+        "disable_override",
+        "exception_list",
+        "expand_domain",
+        "hour",
+        "list_type",
+        "source",
+    )
+
+    LIST_TYPES = ("predefined-ip", "predefined-url", "ip", "domain", "url", "imsi", "imei")
+    CHECK_FOR_UPDATES = ("five-minute", "hourly", "weekly", "monthly", "daily")
+
+    @classmethod
+    def from_entry(cls, entry):
+        types = entry.get("type") if isinstance(entry.get("type"), dict) else {}
+        list_type = next((key for key in types if key in cls.LIST_TYPES), None)
+        type_config = types.get(list_type) if isinstance(types.get(list_type), dict) else {}
+
+        recurring = type_config.get("recurring") if isinstance(type_config.get("recurring"), dict) else {}
+        check_for_updates = next((key for key in recurring if key in cls.CHECK_FOR_UPDATES), None)
+        recurring_config = recurring.get(check_for_updates)
+
+        return cls(
+            entry.get("@name"),
+            list_type=list_type,
+            source=get_text(type_config.get("url")),
+            description=get_text(type_config.get("description")),
+            certificate_profile=get_text(type_config.get("certificate-profile")),
+            check_for_updates=check_for_updates,
+            hour=get_text(get_child(recurring_config, "at")),
+            day_of_week=get_text(get_child(recurring_config, "day-of-week")),
+            day_of_month=get_text(get_child(recurring_config, "day-of-month")),
+            expand_domain=get_text(type_config.get("expand-domain")),
+            exception_list=get_members(type_config.get("exception-list")),
+            disable_override=get_text(entry.get("disable-override")),
+        )
+
+
+class Job:
+    """Job returned by a 'show jobs' call"""
+
+    __slots__ = ("dequeued", "devices", "entry", "finished", "id", "progress", "queued", "result", "status", "type")
+
+    def __init__(self, entry):
+        self.id = get_text(entry.get("id"))
+        self.type = get_text(entry.get("type"))
+        self.status = get_text(entry.get("status"))
+        self.result = get_text(entry.get("result"))
+        self.progress = get_text(entry.get("progress"))
+        self.queued = get_text(entry.get("tenq"))
+        self.dequeued = get_text(entry.get("tdeq"))
+        self.finished = get_text(entry.get("tfin"))
+        self.devices = as_list(get_child(entry.get("devices"), "entry"))
+        # The raw entry is kept for the action results, which expose the job as returned by the device
+        self.entry = entry
+
+    @classmethod
+    def from_entry(cls, entry):
+        return cls(entry)
+
+    def get_timings(self):
+        """Return the seconds the job waited in the queue and the seconds it ran, None when not reported"""
+        queued = parse_job_time(self.queued)
+        dequeued = parse_job_time(self.dequeued, queued)
+        finished = parse_job_time(self.finished, dequeued or queued)
+        return get_seconds(queued, dequeued), get_seconds(dequeued, finished)
+
+    def get_device_durations(self):
+        """Return the seconds each device of a push took, keyed by device name, None when not reported"""
+        queued = parse_job_time(self.queued)
+        dequeued = parse_job_time(self.dequeued, queued)
+
+        durations = {}
+        for device in self.devices:
+            if isinstance(device, dict):
+                name = get_text(device.get("devicename")) or get_text(device.get("serial-no"))
+                durations[name] = get_seconds(dequeued, parse_job_time(get_text(device.get("tfin")), dequeued))
+        return durations
+
+    def __repr__(self):
+        return f"Job(id={self.id!r}, type={self.type!r}, status={self.status!r}, result={self.result!r}, progress={self.progress!r})"
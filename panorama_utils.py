@@ -13,16 +13,28 @@
 # either express or implied. See the License for the specific language governing permissions
 # and limitations under the License.
 
+import asyncio
+import math
+import random
 import re
+import threading
 import time
+from xml.sax.saxutils import escape
 
 import encryption_helper
 import phantom.app as phantom
 import requests
-import xmltodict
 from phantom.action_result import ActionResult
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 import panorama_consts as consts
+from panorama_commit_coalescer import PanoramaCommitCoalescer
+from panorama_job_poller import PanoramaJobPoller
+from panorama_job_registry import PanoramaJobRegistry
+from panorama_rate_limiter import PanoramaRateLimiter
+from panorama_records import DeviceGroup, Job, as_list, from_entries, get_child, get_text
+from panorama_xml import ResponseStream, StreamedEntries, parse_xml
 
 
 class RetVal(tuple):
@@ -38,6 +50,22 @@ class PanoramaUtils:
         self._connector = connector
         self._version = None
         self._key = None
+        self._session = None
+        self._rate_limiter = None
+        self._rate_limit_wait_time = 0
+        self._rate_limit_throttled_calls = 0
+        self._config_batch = None
+        self._debug_capture = None
+        self._config_scopes = set()
+        self._job_registry = None
+        self._reattached_job_ids = []
+        self._commit_finished_time = None
+        self._job_telemetry = {}
+        self._device_group_refresh = None
+        self._tag_cache = {}
+        self._tag_write_scopes = set()
+        # Guards the key, the circuit breaker and the metrics shared by the calls made concurrently by _make_rest_calls
+        self._lock = threading.RLock()
         if connector:
             connector.state = self._decrypt_state(connector.state)
             self._key = connector.state.get(consts.PAN_KEY_TOKEN)
@@ -72,6 +100,9 @@ class PanoramaUtils:
     def _load_pan_version(self, action_result):
         """Load the current version of panorama
 
+        The version is cached in the app state for version_cache_ttl seconds, so the actions gated on it
+        don't query it on every run. See _invalidate_pan_version.
+
         Args:
             action_result : Object of ActionResult class
 
@@ -79,6 +110,12 @@ class PanoramaUtils:
             phantom.APP_ERROR/phantom.APP_SUCCESS: Boolean value of app status
         """
 
+        cached_version = self._get_cached_pan_version()
+        if cached_version:
+            self._connector.debug_print(f"Using the cached version: {cached_version}")
+            self._version = cached_version
+            return phantom.APP_SUCCESS
+
         data = {"type": "version", "key": self._key}
 
         status, _ = self._make_rest_call(data, action_result)
@@ -98,8 +135,35 @@ class PanoramaUtils:
         if not self._version:
             return phantom.APP_ERROR
 
+        if self._get_int_config("version_cache_ttl", consts.DEFAULT_VERSION_CACHE_TTL):
+            self._connector.state[consts.PAN_VERSION_CACHE] = {
+                "host": self._connector.config[phantom.APP_JSON_DEVICE],
+                "version": self._version,
+                "fetched": time.time(),
+            }
+            self._connector.is_state_updated = True
+
         return status
 
+    def _get_cached_pan_version(self):
+        """Return the version cached in the app state, None if it is missing or expired"""
+        ttl = self._get_int_config("version_cache_ttl", consts.DEFAULT_VERSION_CACHE_TTL)
+        cache = self._connector.state.get(consts.PAN_VERSION_CACHE)
+
+        if not ttl or not isinstance(cache, dict) or cache.get("host") != self._connector.config[phantom.APP_JSON_DEVICE]:
+            return None
+
+        if cache.get("fetched", 0) + ttl <= time.time():
+            return None
+
+        return cache.get("version")
+
+    def _invalidate_pan_version(self):
+        """Drop the cached version, the device may have been upgraded (new key) or a version dependent call failed"""
+        if self._connector.state.pop(consts.PAN_VERSION_CACHE, None) is not None:
+            self._connector.debug_print("Invalidated the cached version")
+            self._connector.is_state_updated = True
+
     def _validate_string(self, action_result, string_to_validate, param_name, max_len):
         """Validate given param input string
 
@@ -135,71 +199,740 @@ class PanoramaUtils:
         """Return the xpath to the specified device group
 
         device_entry_name should default to 'localhost.localdomain'.
+        The device group is recorded as a scope of the config touched by the action, for the scoped partial commit.
         """
 
         device_group = param[consts.PAN_JSON_DEVICE_GRP]
 
         if device_group.lower() == consts.PAN_DEV_GRP_SHARED:
+            self._config_scopes.add(consts.PAN_DEV_GRP_SHARED)
             return "/config/shared"
 
+        self._config_scopes.add(device_group)
+
         formatted_device_entry_name = ""
         if device_entry_name:
             formatted_device_entry_name = f"[@name='{device_entry_name}']"
 
         return consts.DEVICE_GRP_XPATH.format(formatted_device_entry_name=formatted_device_entry_name, device_group=device_group)
 
-    def _make_rest_call(self, data, action_result):
-        """This function is used to make the REST call.
+    def _get_projection_fields(self, param):
+        """Return the entry fields requested with the 'fields' parameter, None if all the fields are needed"""
+        fields = [value.strip() for value in (param.get(consts.PAN_JSON_FIELDS) or "").split(",") if value.strip()]
+        return fields or None
+
+    def _get_projected_xpath(self, xpath, fields):
+        """Return the xpath of the entries under the given xpath, narrowed down to the requested fields when possible
+
+        The device can only drop the other nodes when the name is the single field needed,
+        a child node selected on its own loses the entry it belongs to.
+        """
+        if fields == [consts.ENTRY_NAME_FIELD]:
+            return consts.ENTRY_NAME_PROJECTION_XPATH.format(xpath=xpath)
+
+        return xpath
+
+    def _project_entries(self, entries, fields):
+        """Keep only the name and the requested fields of the entries"""
+        if not fields:
+            return entries
+
+        keys = {f"@{consts.ENTRY_NAME_FIELD}", *fields}
+        return [{key: value for key, value in entry.items() if key in keys} for entry in entries if isinstance(entry, dict)]
+
+    def _get_int_config(self, key, default, min_value=0):
+        """Return the numeric asset configuration value for the given key
+
+        Falls back to the default if the value is missing, invalid or lower than min_value.
+        """
+        try:
+            value = int(self._connector.config.get(key, default))
+        except (TypeError, ValueError):
+            self._connector.debug_print(f"Invalid value configured for '{key}', using the default value: {default}")
+            return default
+
+        if value < min_value:
+            self._connector.debug_print(f"Value configured for '{key}' is lower than {min_value}, using the default value: {default}")
+            return default
+
+        return value
+
+    def _get_debug_capture(self):
+        """Return the debug capture mode of the action run, off if the run is not sampled
+
+        The sampling decision is made once, so a sampled action run is captured from its first call to its last.
+        """
+        if self._debug_capture is not None:
+            return self._debug_capture
+
+        mode = str(self._connector.config.get("debug_capture", consts.DEBUG_CAPTURE_OFF)).strip().lower()
+        if mode not in consts.DEBUG_CAPTURE_VALUE_LIST:
+            self._connector.debug_print(f"Invalid value configured for 'debug_capture', using the default value: {consts.DEBUG_CAPTURE_OFF}")
+            mode = consts.DEBUG_CAPTURE_OFF
+
+        sample_rate = self._get_int_config("debug_capture_sample_rate", consts.DEFAULT_DEBUG_CAPTURE_SAMPLE_RATE)
+        if mode != consts.DEBUG_CAPTURE_OFF and random.uniform(0, 100) >= sample_rate:
+            mode = consts.DEBUG_CAPTURE_OFF
+
+        self._debug_capture = mode
+        return mode
+
+    def _format_debug_data(self, data):
+        """Return the data as captured by the debug capture policy of the asset
+
+        The data may be given as a callable returning it, it is only built and converted
+        to a string once it is known to be captured. Returns None if nothing should be captured.
+        """
+        mode = self._get_debug_capture()
+        if mode == consts.DEBUG_CAPTURE_OFF:
+            return None
+
+        if callable(data):
+            data = data()
+        data = data if isinstance(data, str) else str(data)
+
+        max_size = self._get_int_config("debug_capture_max_size", consts.DEFAULT_DEBUG_CAPTURE_MAX_SIZE, min_value=1)
+        if mode == consts.DEBUG_CAPTURE_TRUNCATED and len(data) > max_size:
+            data = data[:max_size] + consts.DEBUG_CAPTURE_TRUNCATED_MESSAGE.format(size=len(data))
+
+        return data
+
+    def _add_debug_data(self, action_result, data):
+        """Add the response to the debug data of the action result if the debug capture policy allows it"""
+        data = self._format_debug_data(data)
+        if data is not None:
+            action_result.add_debug_data(data)
+
+    def _debug_print_data(self, message, data):
+        """Log the message followed by the response if the debug capture policy allows it"""
+        data = self._format_debug_data(data)
+        if data is not None:
+            self._connector.debug_print(f"{message}{data}")
+
+    def _get_session(self):
+        """Return the connection-pooled session used for all the calls made during the action run
+
+        The session keeps the TCP/TLS connection to the device alive between calls,
+        so only the first call of the action pays for the handshake.
+        """
+        with self._lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self):
+        """Create the connection-pooled session, see _get_session"""
+        pool_size = self._get_int_config("connection_pool_size", consts.DEFAULT_CONNECTION_POOL_SIZE, min_value=1)
+
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        session.verify = self._connector.config.get("verify_server_cert", False)
+
+        return session
+
+    def _close_session(self):
+        """Close the pooled session and release its connections"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_rate_limiter(self):
+        """Return the rate limiter shared by all the action runs against the device, None if rate limiting is disabled"""
+        if self._rate_limiter is not None:
+            return self._rate_limiter or None
+
+        rate = self._get_int_config("rate_limit_per_second", consts.DEFAULT_RATE_LIMIT_PER_SECOND)
+        max_in_flight = self._get_int_config("max_in_flight_requests", consts.DEFAULT_MAX_IN_FLIGHT_REQUESTS)
+
+        # False marks the limiter as disabled, so the configuration is only evaluated once
+        self._rate_limiter = False
+        if rate or max_in_flight:
+            self._rate_limiter = PanoramaRateLimiter(
+                self._connector.get_state_dir(), self._connector.config[phantom.APP_JSON_DEVICE], rate, max_in_flight
+            )
+
+        return self._rate_limiter or None
+
+    def _get_job_registry(self):
+        """Return the registry of the jobs shared by all the action runs against the device, None if resuming the jobs is disabled"""
+        if not self._connector.config.get("resume_jobs", False):
+            return None
+
+        if self._job_registry is None:
+            self._job_registry = PanoramaJobRegistry(self._connector.get_state_dir(), self._connector.config[phantom.APP_JSON_DEVICE])
+
+        return self._job_registry
+
+    def _register_job(self, kind, request, job_id):
+        """Record the submitted job in the registry, so a later run can reattach to it"""
+        registry = self._get_job_registry()
+        if registry:
+            registry.register(kind, request, job_id, self._connector.get_action_identifier())
+
+    def _unregister_job(self, job_id):
+        """Remove the finished job from the registry"""
+        registry = self._get_job_registry()
+        if registry:
+            registry.remove(job_id)
+
+    def _find_registered_job(self, kind, request, submitted_after=None, check_running=True):
+        """Return the id of the registered job sending the same request, None if there is none to reattach to
 
         Args:
-            data : dictionary of request body
-            action_result : Object of ActionResult class
+            kind : kind of the job (commit, push, query)
+            request : parameters of the request submitting the job
+            submitted_after : only reattach to a job submitted after this time
+            check_running : only reattach to a job still running on the device, the other ones are removed from the registry
+        """
+        registry = self._get_job_registry()
+        if not registry:
+            return None
+
+        registered_job = registry.find(kind, request, submitted_after)
+        if not registered_job:
+            return None
+
+        job_id = registered_job["job_id"]
+
+        if check_running:
+            status_action_result, job = self._show_jobs([job_id])[job_id]
+            if phantom.is_fail(status_action_result.get_status()) or not isinstance(job, dict) or job.get("status") == "FIN":
+                registry.remove(job_id)
+                return None
+
+        self._connector.debug_print(f"Reattaching to the {kind} job {job_id} submitted by the '{registered_job['owner']}' action")
+        self._reattached_job_ids.append(job_id)
+        return job_id
+
+    def _post(self, data, stream=False):
+        """Send the request to the device, waiting for the rate limiter first when it is enabled"""
+        rate_limiter = self._get_rate_limiter()
+        slot_id = None
+
+        if rate_limiter is not None:
+            try:
+                slot_id, wait_time = rate_limiter.acquire()
+            except Exception as e:
+                self._connector.debug_print("Unable to acquire the rate limiter, sending the call without it", e)
+            else:
+                with self._lock:
+                    self._rate_limit_wait_time += wait_time
+                    if wait_time:
+                        self._rate_limit_throttled_calls += 1
+
+        try:
+            return self._get_session().post(self._connector.base_url, data=data, timeout=consts.DEFAULT_TIMEOUT, stream=stream)
+        finally:
+            if slot_id is not None:
+                try:
+                    rate_limiter.release(slot_id)
+                except Exception as e:
+                    self._connector.debug_print("Unable to release the rate limiter slot", e)
+
+    def _add_rate_limit_summary(self):
+        """Add the time spent waiting on the rate limiter to the summary of the action results"""
+        if not self._get_rate_limiter():
+            return
+
+        summary = {"wait_time": round(self._rate_limit_wait_time, 3), "throttled_calls": self._rate_limit_throttled_calls}
+        for action_result in self._connector.get_action_results():
+            action_result.update_summary({"rate_limit": summary})
+
+    def _get_circuit_breaker(self):
+        """Return the circuit breaker state persisted in the asset state"""
+        return self._connector.state.setdefault(
+            consts.PAN_CIRCUIT_BREAKER, {"state": consts.CIRCUIT_BREAKER_CLOSED, "failures": 0, "opened_at": None}
+        )
+
+    def _update_circuit_breaker(self, **kwargs):
+        """Update the circuit breaker state and mark the asset state to be saved"""
+        with self._lock:
+            circuit_breaker = self._get_circuit_breaker()
+            if any(circuit_breaker.get(key) != value for key, value in kwargs.items()):
+                circuit_breaker.update(kwargs)
+                self._connector.is_state_updated = True
+
+    def _check_circuit_breaker(self, action_result):
+        """Check whether calls can be sent to the device
+
+        While the circuit is open, calls fail right away instead of waiting for the timeout.
+        Once the cooldown has elapsed, the circuit is half-open and a cheap version call probes
+        the device: the circuit closes if it answers and opens again otherwise.
 
         Returns:
-            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), response obtained by making an API call
+            phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message)
         """
+        threshold = self._get_int_config("circuit_breaker_threshold", consts.DEFAULT_CIRCUIT_BREAKER_THRESHOLD)
+        circuit_breaker = self._get_circuit_breaker()
+
+        if not threshold or circuit_breaker["state"] == consts.CIRCUIT_BREAKER_CLOSED:
+            return phantom.APP_SUCCESS
+
+        cooldown = self._get_int_config("circuit_breaker_cooldown", consts.DEFAULT_CIRCUIT_BREAKER_COOLDOWN)
+        remaining_time = (circuit_breaker.get("opened_at") or 0) + cooldown - time.time()
+
+        if circuit_breaker["state"] == consts.CIRCUIT_BREAKER_OPEN and remaining_time > 0:
+            return action_result.set_status(
+                phantom.APP_ERROR,
+                consts.PAN_ERROR_CIRCUIT_BREAKER_OPEN.format(failures=circuit_breaker["failures"], remaining_time=int(remaining_time) + 1),
+            )
+
+        self._update_circuit_breaker(state=consts.CIRCUIT_BREAKER_HALF_OPEN)
+        self._connector.debug_print("Circuit breaker is half-open, probing the device")
 
-        self._connector.debug_print("Making rest call")
         try:
-            response = requests.post(
-                self._connector.base_url,
-                data=data,
-                verify=self._connector.config.get("verify_server_cert", False),
-                timeout=consts.DEFAULT_TIMEOUT,
+            response = self._post({"type": "version", "key": self._key})
+            is_reachable = response.status_code < 500
+        except Exception as e:
+            self._connector.debug_print("Circuit breaker probe failed", e)
+            is_reachable = False
+
+        if not is_reachable:
+            self._update_circuit_breaker(state=consts.CIRCUIT_BREAKER_OPEN, opened_at=time.time())
+            return action_result.set_status(
+                phantom.APP_ERROR, consts.PAN_ERROR_CIRCUIT_BREAKER_OPEN.format(failures=circuit_breaker["failures"], remaining_time=cooldown)
             )
+
+        self._connector.debug_print("Circuit breaker probe succeeded, closing the circuit")
+        self._update_circuit_breaker(state=consts.CIRCUIT_BREAKER_CLOSED, failures=0, opened_at=None)
+        return phantom.APP_SUCCESS
+
+    def _record_circuit_breaker_result(self, is_failure):
+        """Record the outcome of a call, the circuit opens after too many consecutive connection failures"""
+        threshold = self._get_int_config("circuit_breaker_threshold", consts.DEFAULT_CIRCUIT_BREAKER_THRESHOLD)
+        if not threshold:
+            return
+
+        if not is_failure:
+            self._update_circuit_breaker(state=consts.CIRCUIT_BREAKER_CLOSED, failures=0, opened_at=None)
+            return
+
+        with self._lock:
+            failures = self._get_circuit_breaker()["failures"] + 1
+            self._update_circuit_breaker(failures=failures)
+
+            if failures >= threshold:
+                self._connector.debug_print(f"Opening the circuit breaker after {failures} consecutive connection failures")
+                self._update_circuit_breaker(state=consts.CIRCUIT_BREAKER_OPEN, opened_at=time.time())
+
+    def _get_retry_settings(self):
+        """Return the retry policy configured on the asset"""
+        error_classes = self._connector.config.get("retry_error_classes", consts.DEFAULT_RETRY_ERROR_CLASSES) or ""
+        error_classes = {value.strip().lower() for value in error_classes.split(",") if value.strip()}
+
+        unknown_error_classes = error_classes - set(consts.RETRY_ERROR_CLASS_VALUE_LIST)
+        if unknown_error_classes:
+            self._connector.debug_print(f"Ignoring unknown retry error classes: {unknown_error_classes}")
+
+        return {
+            "error_classes": error_classes & set(consts.RETRY_ERROR_CLASS_VALUE_LIST),
+            "max_attempts": self._get_int_config("retry_max_attempts", consts.DEFAULT_RETRY_MAX_ATTEMPTS, min_value=1),
+            "backoff": self._get_int_config("retry_backoff_seconds", consts.DEFAULT_RETRY_BACKOFF_SECONDS),
+            "time_budget": self._get_int_config("retry_time_budget", consts.DEFAULT_RETRY_TIME_BUDGET),
+        }
+
+    def _is_idempotent_request(self, data):
+        """Check whether the request only reads from the device and can safely be sent again"""
+        request_type = data.get("type")
+
+        if request_type == "config":
+            return data.get("action") in consts.IDEMPOTENT_CONFIG_ACTIONS
+
+        if request_type == "op":
+            return data.get("cmd", "").strip().startswith("<show>")
+
+        return request_type in consts.IDEMPOTENT_REQUEST_TYPES
+
+    def _is_connection_not_established(self, e):
+        """Check whether the request failed before reaching the device"""
+        if isinstance(e, requests.exceptions.ConnectTimeout):
+            return True
+
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        return isinstance(e, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+    def _get_retry_error_class(self, response, error, is_idempotent):
+        """Classify a failed request into one of the retry error classes
+
+        Writes are only classified when the device did not process the request, so they are never applied twice.
+
+        Returns:
+            retry error class or None if the failure should not be retried
+        """
+        if error is not None:
+            if is_idempotent or self._is_connection_not_established(error):
+                return consts.RETRY_CONNECTION_ERROR
+            return None
+
+        if response.status_code == 503 or (is_idempotent and response.status_code >= 500):
+            return consts.RETRY_SERVER_ERROR
+
+        return None
+
+    def _get_retry_delay(self, attempt, retry_settings, start_time):
+        """Return the delay before the next attempt, None if the retry budget is exhausted
+
+        The delay grows exponentially with the attempt number and uses full jitter, so the
+        parallel action runs hitting the same device do not retry in lockstep.
+        """
+        if attempt >= retry_settings["max_attempts"]:
+            return None
+
+        delay = random.uniform(0, min(consts.MAX_RETRY_BACKOFF_SECONDS, retry_settings["backoff"] * 2 ** (attempt - 1)))
+
+        if time.time() - start_time + delay > retry_settings["time_budget"]:
+            return None
+
+        return delay
+
+    def _parse_xml_response(self, response, action_result, entry_path=None):
+        """Parse the XML body of the given response into a dictionary
+
+        Args:
+            response : response object of the REST call
+            action_result : Object of ActionResult class
+            entry_path : path of the entries to parse incrementally, only the rest of the response is parsed upfront
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), response dictionary,
+            generator of the entries found at entry_path (None if entry_path is not given)
+        """
+        if entry_path:
+            return self._parse_streaming_xml_response(response, action_result, entry_path)
+
+        self._add_debug_data(action_result, lambda: response.text)
+
+        try:
+            response_dict = parse_xml(response.content)
         except Exception as e:
-            self._connector.debug_print(consts.PAN_ERROR_DEVICE_CONNECTIVITY, e)
+            self._connector.save_progress(consts.PAN_ERROR_UNABLE_TO_PARSE_REPLY)
             return (
-                action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_DEVICE_CONNECTIVITY, self._get_error_message_from_exception(e)),
-                e,
+                action_result.set_status(
+                    phantom.APP_ERROR, consts.PAN_ERROR_UNABLE_TO_PARSE_REPLY.format(error=self._get_error_message_from_exception(e))
+                ),
+                None,
+                None,
             )
 
-        if response.status_code == 403 and response.reason == "Invalid Credential":
-            status = self._generate_token(action_result)
-            if phantom.is_fail(status):
-                return action_result.get_status()
-            data["key"] = self._key
-            return self._make_rest_call(data, action_result)
-
-        xml = response.text
+        return phantom.APP_SUCCESS, response_dict, None
 
-        action_result.add_debug_data(xml)
+    def _parse_streaming_xml_response(self, response, action_result, entry_path):
+        """Parse the response up to its first entry, the entries are parsed one at a time as the generator is consumed"""
+        response.raw.decode_content = True
+        response_stream = ResponseStream(response.raw, entry_path)
 
         try:
-            response_dict = xmltodict.parse(xml)
+            response_dict = response_stream.read_header()
+            if response_dict is None:
+                raise ValueError("Empty response")
         except Exception as e:
+            response.close()
             self._connector.save_progress(consts.PAN_ERROR_UNABLE_TO_PARSE_REPLY)
             return (
                 action_result.set_status(
                     phantom.APP_ERROR, consts.PAN_ERROR_UNABLE_TO_PARSE_REPLY.format(error=self._get_error_message_from_exception(e))
                 ),
+                None,
+                None,
             )
 
-        status = self._parse_response(response_dict, action_result)
+        self._add_debug_data(action_result, response_dict)
+
+        return phantom.APP_SUCCESS, response_dict, StreamedEntries(response_stream.entries(), response.close)
+
+    def _make_rest_call(self, data, action_result):
+        """This function is used to make the REST call.
+
+        Transient failures are retried based on the retry policy configured on the asset.
+
+        Args:
+            data : dictionary of request body
+            action_result : Object of ActionResult class
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), response obtained by making an API call
+        """
+        status, response_dict, _ = self._send_request(data, action_result)
+        return status, response_dict
+
+    def _make_streaming_rest_call(self, data, action_result, entry_path):
+        """Make the REST call and parse the entries of the response one at a time
+
+        Meant for the large responses (e.g. the application catalog or log query results), the
+        entries at entry_path are neither added to the response dictionary nor to the action result.
+
+        Args:
+            data : dictionary of request body
+            action_result : Object of ActionResult class
+            entry_path : path of the entries in the response, e.g. 'response/result/application/entry'
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), response dictionary without the entries,
+            StreamedEntries of the entry dictionaries, to be closed (e.g. with 'with') when they are not all consumed
+        """
+        status, response_dict, entries = self._send_request(data, action_result, entry_path)
+        return status, response_dict, entries if entries is not None else StreamedEntries()
+
+    def _send_request(self, data, action_result, entry_path=None):
+        """Send the request with the retry policy and parse the response, see _make_rest_call and _make_streaming_rest_call"""
+
+        self._connector.debug_print("Making rest call")
+
+        status = self._check_circuit_breaker(action_result)
         if phantom.is_fail(status):
-            return action_result.get_status(), response_dict
+            return action_result.get_status(), None, None
+
+        retry_settings = self._get_retry_settings()
+        is_idempotent = self._is_idempotent_request(data)
+        is_token_regenerated = False
+        start_time = time.time()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            response, response_dict, entries, error = None, None, None, None
+
+            try:
+                response = self._post(data, stream=bool(entry_path))
+            except Exception as e:
+                self._connector.debug_print(consts.PAN_ERROR_DEVICE_CONNECTIVITY, e)
+                error = e
+
+            if response is not None and response.status_code == 403 and response.reason == "Invalid Credential" and not is_token_regenerated:
+                # The key is no longer valid, generate a new one and replay the call once
+                status = self._regenerate_token(action_result, data.get("key"))
+                if phantom.is_fail(status):
+                    return action_result.get_status(), None, None
+                data["key"] = self._key
+                is_token_regenerated = True
+                attempt -= 1
+                response.close()
+                continue
+
+            error_class = self._get_retry_error_class(response, error, is_idempotent)
+
+            if error_class is None and error is None:
+                status, response_dict, entries = self._parse_xml_response(response, action_result, entry_path)
+                if phantom.is_fail(status):
+                    return action_result.get_status(), None, None
+
+                if (response_dict.get("response") or {}).get("@code") == consts.PAN_SESSION_TIMED_OUT_CODE:
+                    error_class = consts.RETRY_SESSION_TIMEOUT
+
+            if error_class not in retry_settings["error_classes"]:
+                break
+
+            delay = self._get_retry_delay(attempt, retry_settings, start_time)
+            if delay is None:
+                self._connector.debug_print(f"Retry budget exhausted after {attempt} attempt(s) for error class '{error_class}'")
+                break
+
+            self._connector.debug_print(f"Retrying the call in {delay:.2f} seconds, attempt {attempt} failed with error class '{error_class}'")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+            if error_class == consts.RETRY_SESSION_TIMEOUT:
+                status = self._regenerate_token(action_result, data.get("key"))
+                if phantom.is_fail(status):
+                    return action_result.get_status(), None, None
+                data["key"] = self._key
+
+        self._record_circuit_breaker_result(error is not None or response.status_code >= 500)
+
+        if error is not None:
+            return (
+                action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_DEVICE_CONNECTIVITY, self._get_error_message_from_exception(error)),
+                error,
+                None,
+            )
+
+        if response_dict is None:
+            status, response_dict, entries = self._parse_xml_response(response, action_result, entry_path)
+            if phantom.is_fail(status):
+                return action_result.get_status(), None, None
+
+        response_body = response_dict.get("response")
+        if entry_path and isinstance(response_body, dict):
+            # The streamed result is handed to the caller instead of being added to the action result
+            status = self._parse_response({"response": {key: value for key, value in response_body.items() if key != "result"}}, action_result)
+        else:
+            status = self._parse_response(response_dict, action_result)
+
+        if entries is not None and phantom.is_fail(status):
+            # nobody reads the entries of a failed call, the connection is released right away
+            entries.close()
+            entries = None
+
+        return status, response_dict, entries
+
+    async def _make_rest_call_async(self, data, action_result):
+        """Asyncio counterpart of _make_rest_call with the same arguments and return value
+
+        The blocking call runs in a worker thread, so several calls can be awaited concurrently.
+        """
+        return await asyncio.to_thread(self._make_rest_call, data, action_result)
+
+    async def _make_rest_calls_async(self, requests_data, max_concurrency):
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def make_call(data):
+            async with semaphore:
+                call_action_result = ActionResult()
+                _, response = await self._make_rest_call_async(data, call_action_result)
+                return call_action_result, response
+
+        return await asyncio.gather(*(make_call(data) for data in requests_data))
+
+    def _make_rest_calls(self, requests_data, max_concurrency=None):
+        """Make independent REST calls concurrently
+
+        Each call gets its own action result, so the data and status of concurrent calls never mix.
+
+        Args:
+            requests_data : list of request body dictionaries
+            max_concurrency : maximum number of calls running at the same time, defaults to the asset configuration
+
+        Returns:
+            List of (action_result, response) in the order of requests_data
+        """
+        if not requests_data:
+            return []
+
+        if not max_concurrency:
+            max_concurrency = self._get_int_config("request_concurrency", consts.DEFAULT_REQUEST_CONCURRENCY, min_value=1)
+
+        # The session is created once, before the worker threads share it
+        self._get_session()
+
+        if max_concurrency == 1 or len(requests_data) == 1:
+            results = []
+            for data in requests_data:
+                call_action_result = ActionResult()
+                _, response = self._make_rest_call(data, call_action_result)
+                results.append((call_action_result, response))
+            return results
+
+        return asyncio.run(self._make_rest_calls_async(requests_data, max_concurrency))
+
+    def _update_summary_path(self, action_result, summary_key, value):
+        """Update the summary of the action result, summary_key can be a tuple to update a nested key"""
+        if isinstance(summary_key, str):
+            return action_result.update_summary({summary_key: value})
+
+        *parent_keys, last_key = summary_key
+        summary = action_result.get_summary() or {}
+        root = node = dict(summary.get(parent_keys[0]) or {})
+        for key in parent_keys[1:]:
+            node[key] = dict(node.get(key) or {})
+            node = node[key]
+        node[last_key] = value
+
+        return action_result.update_summary({parent_keys[0]: root})
+
+    def _start_config_batch(self):
+        """Start collecting config set, edit and delete requests to send them as multi-config calls
+
+        Batching is only done if it is enabled on the asset.
+
+        Returns:
+            True if the batch has been started
+        """
+        if not self._connector.config.get("use_multi_config", False):
+            return False
+
+        self._config_batch = []
+        return True
+
+    def _queue_config_request(self, data, action_result, summary_key=None):
+        """Queue the config request in the current batch, the request is sent right away if there is no batch
+
+        Args:
+            data : dictionary of request body
+            action_result : Object of ActionResult class
+            summary_key : summary key (or tuple of nested keys) the response is added under
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message)
+        """
+        if self._config_batch is None or data.get("type") != "config" or data.get("action") not in consts.MULTI_CONFIG_ACTIONS:
+            status, response = self._make_rest_call(data, action_result)
+            if summary_key:
+                self._update_summary_path(action_result, summary_key, response)
+            return status
+
+        request_id = str(len(self._config_batch) + 1)
+        xpath = escape(data["xpath"], {'"': "&quot;"})
+        sub_request = f'<{data["action"]} id="{request_id}" xpath="{xpath}">{data.get("element", "")}</{data["action"]}>'
+
+        self._config_batch.append((request_id, sub_request, summary_key))
+        return phantom.APP_SUCCESS
+
+    def _get_config_batch_chunks(self, config_batch):
+        """Split the queued requests in chunks that fit the multi-config element size limit"""
+        chunk, chunk_size = [], 0
+
+        for queued_request in config_batch:
+            sub_request_size = len(queued_request[1])
+            if chunk and chunk_size + sub_request_size > consts.MAX_MULTI_CONFIG_ELEMENT_SIZE:
+                yield chunk
+                chunk, chunk_size = [], 0
+            chunk.append(queued_request)
+            chunk_size += sub_request_size
+
+        if chunk:
+            yield chunk
+
+    def _get_multi_config_sub_responses(self, response):
+        """Return the responses of the multi-config sub requests keyed by request id"""
+        try:
+            sub_responses = response["response"].get("response") or []
+        except (AttributeError, KeyError, TypeError):
+            return {}
 
-        return action_result.get_status(), response_dict
+        if isinstance(sub_responses, dict):
+            sub_responses = [sub_responses]
+
+        return {sub_response.get("@id"): sub_response for sub_response in sub_responses if isinstance(sub_response, dict)}
+
+    def _flush_config_batch(self, action_result):
+        """Send the queued config requests as multi-config calls and end the batch
+
+        The response of each sub request is added to the summary under the key it was queued with.
+        Each call is applied as a whole by the device, the queued requests are only split
+        in several calls if they exceed the element size limit.
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message)
+        """
+        config_batch, self._config_batch = self._config_batch, None
+        if not config_batch:
+            return phantom.APP_SUCCESS
+
+        for chunk in self._get_config_batch_chunks(config_batch):
+            self._connector.debug_print(f"Sending {len(chunk)} config requests in a multi-config call")
+            element = "".join(sub_request for _, sub_request, _ in chunk)
+            data = {
+                "type": "config",
+                "action": "multi-config",
+                "key": self._key,
+                "element": f"<multi-configure-request>{element}</multi-configure-request>",
+            }
+
+            status, response = self._make_rest_call(data, action_result)
+            sub_responses = self._get_multi_config_sub_responses(response)
+
+            for request_id, _, summary_key in chunk:
+                sub_response = sub_responses.get(request_id)
+                if sub_response and sub_response.get("@status") != "success":
+                    self._parse_response_msg(sub_response, action_result, None)
+                if summary_key:
+                    self._update_summary_path(action_result, summary_key, {"response": sub_response} if sub_response else response)
+
+            if phantom.is_fail(status):
+                return action_result.get_status()
+
+        return action_result.get_status()
 
     def _add_url_to_url_category(self, param, action_result, url_prof_name):
         """Add the given url to Objects > Custom Objects > URL Category > Phantom URL List for your device group
@@ -219,6 +952,23 @@ class PanoramaUtils:
 
         return status
 
+    def _regenerate_token(self, action_result, stale_key):
+        """Generate a new key in place of the stale one sent with a call
+
+        The concurrent calls rejected with the same stale key only generate one new key, the others reuse it.
+
+        Args:
+            action_result : Object of ActionResult class
+            stale_key : key the call was sent with
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message)
+        """
+        with self._lock:
+            if self._key and self._key != stale_key:
+                return phantom.APP_SUCCESS
+            return self._generate_token(action_result)
+
     def _generate_token(self, action_result):
         """This function is used to generate key
 
@@ -237,23 +987,17 @@ class PanoramaUtils:
 
         self._connector.debug_print("Make a rest call to generate key token")
         try:
-            response = requests.post(
-                self._connector.base_url,
-                data=data,
-                verify=self._connector.config.get("verify_server_cert", False),
-                timeout=consts.DEFAULT_TIMEOUT,
-            )
+            response = self._post(data)
         except Exception as e:
             self._connector.debug_print(consts.PAN_ERROR_DEVICE_CONNECTIVITY)
             return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_DEVICE_CONNECTIVITY, self._get_error_message_from_exception(e))
         self._connector.debug_print("Done making a rest call to generate key token")
 
-        xml = response.text
         response_msg = response.reason
 
         # parse xml response into dict
         try:
-            response_dict = xmltodict.parse(xml)
+            response_dict = parse_xml(response.content)
         except Exception as e:
             return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_UNABLE_TO_PARSE_REPLY, self._get_error_message_from_exception(e))
 
@@ -288,6 +1032,8 @@ class PanoramaUtils:
         self._key = key
         self._connector.state[consts.PAN_KEY_TOKEN] = self._key
         self._connector.is_state_updated = True
+        # A new key is generated after an upgrade or a credential change, the version is fetched again
+        self._invalidate_pan_version()
         return phantom.APP_SUCCESS
 
     def _add_commit_status(self, job, action_result):
@@ -321,33 +1067,61 @@ class PanoramaUtils:
 
         return phantom.APP_SUCCESS
 
-    def _commit_config(self, param, action_result):
-        """Commit candidate changes to the firewall by default
+    def _get_partial_commit_scope(self, param):
+        """Return the elements of the <partial> commit request, empty for a full commit
 
-        With enabled partial, we commit admin-level changes on a firewall by including the administrator name in the request. # noqa
-        Example: https://docs.paloaltonetworks.com/pan-os/8-1/pan-os-panorama-api/pan-os-xml-api-request-types/commit-configuration-api/commit.html # noqa
-        Commit doc: https://docs.paloaltonetworks.com/pan-os/9-1/pan-os-web-interface-help/panorama-web-interface/panorama-commit-operations.html # noqa
+        With scoped_partial_commit, the commit is limited to the device groups whose config the action touched,
+        the shared objects are excluded unless they were touched. When only shared was touched, the commit is not scoped:
+        Panorama has no element limiting a commit to shared. The admin scope is added with use_partial_commit.
         """
-        self._connector.debug_print("START Committing Config changes")
+        partial = ""
 
-        cmd = "<commit></commit>"
+        device_groups = sorted(self._config_scopes - {consts.PAN_DEV_GRP_SHARED})
+        if self._connector.config.get("scoped_partial_commit", False) and device_groups:
+            members = "".join(f"<member>{device_group}</member>" for device_group in device_groups)
+            partial = f"<device-group>{members}</device-group>"
 
-        use_partial_commit = param.get("use_partial_commit", False)
-        if use_partial_commit:
+            if consts.PAN_DEV_GRP_SHARED not in self._config_scopes:
+                partial = f"{partial}{consts.PARTIAL_COMMIT_EXCLUDED.format(scope='shared-object')}"
+
+        if param.get("use_partial_commit", False):
             username = self._connector.config[phantom.APP_JSON_USERNAME]
-            cmd = f"<commit><partial><admin><member>{username}</member></admin></partial></commit>"
+            partial = f"{partial}<admin><member>{username}</member></admin>"
+
+        return partial
+
+    def _submit_commit_config(self, param, action_result, reattach=True):
+        """Send the commit request of the candidate changes
+
+        With resume_jobs, the commit job still running from an earlier run sending the same request is reattached to.
+
+        Returns:
+            job id of the commit, None if the request failed (the action result is updated with the failure)
+        """
+        partial = self._get_partial_commit_scope(param)
+
+        cmd = "<commit></commit>"
+        if partial:
+            cmd = f"<commit><partial>{partial}</partial></commit>"
 
         data = {"type": "commit", "cmd": cmd, "key": self._key}
 
-        if use_partial_commit:
+        if partial:
             data.update({"action": "partial"})
 
+        job_request = {"cmd": cmd, "action": data.get("action")}
+        job_id = self._find_registered_job(consts.JOB_KIND_COMMIT, job_request) if reattach else None
+        if job_id:
+            self._start_job_telemetry(job_id)
+            return job_id
+
         self._connector.debug_print(f"Committing with data: {data}")
+        submit_time = time.time()
         status, _ = self._make_rest_call(data, action_result)
 
         if phantom.is_fail(status):
             self._connector.debug_print(f"Failed to commit Config changes. Reason: {action_result.get_message()}")
-            return action_result.get_status()
+            return None
 
         # Get the job id of the commit call from the result_data, also pop it since we don't need it
         # to be in the action result
@@ -355,7 +1129,7 @@ class PanoramaUtils:
 
         if len(result_data) == 0:
             self._connector.debug_print("NO result data")
-            return action_result.get_status()
+            return None
 
         # Monitor the job from the result of commit config above
         result_data = result_data.pop()
@@ -363,20 +1137,42 @@ class PanoramaUtils:
         if not isinstance(result_data, dict):
             error_message = f"Failed to retrieve job id from {result_data}"
             self._connector.debug_print(error_message)
-            return action_result.set_status(phantom.APP_ERROR, error_message)
+            action_result.set_status(phantom.APP_ERROR, error_message)
+            return None
 
         job_id = result_data.get("job")
 
         if not job_id:
             self._connector.debug_print("Failed to commit Config changes. Reason: NO job id")
-            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            return None
 
         self._connector.debug_print(f"Successful committed change with job_id: {job_id}")
         self._connector.debug_print(f"Commit Job id: {job_id}")
 
+        self._register_job(consts.JOB_KIND_COMMIT, job_request, job_id)
+        self._start_job_telemetry(job_id, time.time() - submit_time)
+
+        return job_id
+
+    def _commit_config(self, param, action_result):
+        """Commit candidate changes to the firewall by default
+
+        With enabled partial, we commit admin-level changes on a firewall by including the administrator name in the request. # noqa
+        Example: https://docs.paloaltonetworks.com/pan-os/8-1/pan-os-panorama-api/pan-os-xml-api-request-types/commit-configuration-api/commit.html # noqa
+        Commit doc: https://docs.paloaltonetworks.com/pan-os/9-1/pan-os-web-interface-help/panorama-web-interface/panorama-commit-operations.html # noqa
+        """
+        self._connector.debug_print("START Committing Config changes")
+
+        job_id = self._submit_commit_config(param, action_result)
+
+        if not job_id:
+            return action_result.get_status()
+
         # Keep querying Job info until we find a Finished job
         # Update the action result with the finished job
-        while True:
+        def check_commit_job(job_ids):
+            self._count_job_polls(job_ids)
             data = {"type": "op", "key": self._key, "cmd": f"<show><jobs><id>{job_id}</id></jobs></show>"}
 
             status_action_result = ActionResult()
@@ -386,7 +1182,7 @@ class PanoramaUtils:
             if phantom.is_fail(status):
                 action_result.set_status(phantom.APP_SUCCESS, status_action_result.get_message())
                 self._connector.debug_print(f"Failed to get info for job id: {job_id}")
-                return action_result.get_status()
+                return {}
 
             self._connector.debug_print("status", status_action_result)
 
@@ -398,33 +1194,142 @@ class PanoramaUtils:
 
                 if job_status == "FIN":
                     self._connector.debug_print(f"Finished job: {job}")
+                    self._unregister_job(job_id)
+                    self._commit_finished_time = time.time()
                     self._add_commit_status(job, action_result)
-                    action_result.update_summary({"commit_config": {"finished_job": job}})
-                    break
+                    telemetry = self._finish_job_telemetry(job, [consts.COMMIT_HISTORY_COMMIT_KEY])
+                    action_result.update_summary({"commit_config": {"finished_job": job, "telemetry": telemetry}})
+                    return {}
             except Exception as e:
                 self._connector.debug_print(f"Failed to find a finished job. Reason: {e}")
                 error = self._get_error_message_from_exception(e)
-                return action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
+                action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
+                return {}
+
+            return {job_id: job.get("progress")}
 
-            # send the % progress
-            self._connector.send_progress(consts.PAN_PROG_COMMIT_PROGRESS, progress=job.get("progress"))
+        poller = PanoramaJobPoller(self, check_commit_job, on_timeout=lambda job_ids: self._set_job_poll_timeout(action_result, job_id))
+        poller.add(job_id)
+        poller.wait()
 
-            time.sleep(2)
+        if job_id in self._reattached_job_ids and phantom.is_success(action_result.get_status()) and self._has_pending_changes() is not False:
+            # The reattached commit was submitted before some of the pending changes were made,
+            # they are also committed again when the check failed, rather than being left uncommitted
+            self._connector.debug_print("Changes may still be pending after the reattached commit, committing them")
+            return self._commit_config(param, action_result)
 
         self._connector.debug_print("DONE Committing Config changes")
         return action_result.get_status()
 
-    def _get_all_device_groups(self, param, action_result):
+    def _start_job_telemetry(self, job_id, submit_latency=None):
+        """Start tracking the timings of the submitted (or reattached) job"""
+        self._job_telemetry[job_id] = {
+            "submit_latency": round(submit_latency, 3) if submit_latency is not None else None,
+            "polls": 0,
+            "start_time": time.time(),
+        }
+
+    def _count_job_polls(self, job_ids):
+        """Count a status check of the given jobs"""
+        for job_id in job_ids:
+            self._job_telemetry.setdefault(job_id, {"submit_latency": None, "polls": 0, "start_time": None})["polls"] += 1
+
+    def _finish_job_telemetry(self, job, history_keys):
+        """Return the timings of the finished job, its duration is added to the commit history of the given keys
+
+        Args:
+            job : finished job
+            history_keys : keys of the commit history, 'commit' for the commit and the device group names for the pushes
+
+        Returns:
+            dictionary of the submit latency, queue wait, duration, per device duration and poll count of the job
+        """
+        record = Job(job)
+        telemetry = dict(self._job_telemetry.pop(record.id, {"submit_latency": None, "polls": 0, "start_time": None}))
+        start_time = telemetry.pop("start_time")
+        queue_wait, duration = record.get_timings()
+
+        telemetry.update(
+            {
+                "queue_wait": queue_wait,
+                "duration": duration,
+                # time from the submission to the check seeing the job finished, when the device doesn't report the times
+                "wall_time": round(time.time() - start_time, 3) if start_time else None,
+            }
+        )
+
+        device_durations = record.get_device_durations()
+        if device_durations:
+            telemetry["device_durations"] = device_durations
+
+        self._add_commit_history(history_keys, duration if duration is not None else telemetry["wall_time"])
+
+        return telemetry
+
+    def _add_commit_history(self, history_keys, duration):
+        """Add the duration to the rolling commit history kept in the app state"""
+        if duration is None:
+            return
+
+        history = self._connector.state.setdefault(consts.COMMIT_HISTORY_STATE_KEY, {})
+        for key in history_keys:
+            history[key] = [*history.get(key, []), duration][-consts.COMMIT_HISTORY_SIZE :]
+
+        self._connector.is_state_updated = True
+
+    def _get_percentile(self, values, percentile):
+        """Return the nearest-rank percentile of the values"""
+        values = sorted(values)
+        return values[max(math.ceil(percentile / 100 * len(values)) - 1, 0)]
+
+    def _get_commit_history_summary(self, history_keys):
+        """Return the count, p50 and p95 of the durations in the commit history of the given keys"""
+        history = self._connector.state.get(consts.COMMIT_HISTORY_STATE_KEY, {})
+        return {
+            key: {"count": len(history[key]), "p50": self._get_percentile(history[key], 50), "p95": self._get_percentile(history[key], 95)}
+            for key in dict.fromkeys(history_keys)
+            if history.get(key)
+        }
+
+    def _set_job_poll_timeout(self, action_result, job_id):
+        """Fail the action result of the job which did not finish before the job poll deadline"""
+        timeout = self._get_int_config("job_poll_timeout", consts.DEFAULT_JOB_POLL_TIMEOUT)
+        return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_JOB_POLL_TIMEOUT.format(job_id=job_id, timeout=timeout))
+
+    def _get_all_device_groups(self, param, action_result, refresh=False):
         """Get all the device groups configured on the system
 
         Args:
             param : Dictionary of parameters
             action_result : Object of ActionResult class
+            refresh : whether to bypass the device group inventory cached in the app state
 
         Returns:
             Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), list of device groups
         """
 
+        if self._get_int_config("device_group_cache_ttl", consts.DEFAULT_DEVICE_GROUP_CACHE_TTL):
+            status, inventory = self._get_device_group_inventory(action_result, refresh)
+            if phantom.is_fail(status):
+                return action_result.get_status(), []
+            return phantom.APP_SUCCESS, list(inventory)
+
+        status, device_groups = self._get_device_group_records(action_result)
+        if phantom.is_fail(status):
+            return action_result.get_status(), []
+
+        return phantom.APP_SUCCESS, [device_group.name for device_group in device_groups]
+
+    def _get_device_group_records(self, action_result):
+        """Fetch the device groups configured on the system
+
+        Args:
+            action_result : Object of ActionResult class
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), list of DeviceGroup records
+        """
+
         self._connector.debug_print("Start retrieving all device groups")
 
         device_groups = []
@@ -442,7 +1347,7 @@ class PanoramaUtils:
         if not result_data:
             return (action_result.set_status(phantom.APP_ERROR, "Got empty list for device groups"), device_groups)
 
-        self._connector.debug_print(f"Getting Device Groups config from {result_data}")
+        self._debug_print_data("Getting Device Groups config from ", result_data)
         device_groups_config = result_data.pop()
 
         if not isinstance(device_groups_config, dict):
@@ -451,7 +1356,7 @@ class PanoramaUtils:
             return action_result.set_status(phantom.APP_ERROR, error_message), []
 
         try:
-            device_groups = device_groups_config["device-group"]["entry"]
+            device_groups = from_entries(DeviceGroup, device_groups_config["device-group"]["entry"])
         except Exception as e:
             self._connector.debug_print(f"Failed to extracted device_groups from {device_groups_config}. Reason: {e}")
             return (
@@ -459,16 +1364,153 @@ class PanoramaUtils:
                 self._get_error_message_from_exception(e),
             )
 
-        try:
-            device_groups = [x["@name"] for x in device_groups]
-        except:
-            device_groups = [device_groups["@name"]]
-
         # remove the data from action_result
         action_result.set_data_size(0)
         action_result.set_status(phantom.APP_ERROR)
 
-        return phantom.APP_SUCCESS, device_groups
+        return phantom.APP_SUCCESS, device_groups
+
+    def _get_device_group_parents(self):
+        """Return the parent of every device group, None for the device groups right below shared
+
+        Returns:
+            dictionary of the parent device group keyed by device group, empty if the hierarchy could not be fetched
+        """
+        status_action_result = ActionResult()
+        status, _ = self._make_rest_call({"type": "op", "key": self._key, "cmd": consts.SHOW_DEVICE_GROUP_HIERARCHY_CMD}, status_action_result)
+        result_data = status_action_result.get_data()
+
+        if phantom.is_fail(status) or not result_data or not isinstance(result_data[0], dict):
+            self._connector.debug_print(f"Failed to fetch the device group hierarchy. Reason: {status_action_result.get_message()}")
+            return {}
+
+        parents = {}
+        entries = [(entry, None) for entry in as_list(get_child(result_data[0].get("dg-hierarchy"), "dg"))]
+        while entries:
+            entry, parent = entries.pop()
+            if isinstance(entry, dict):
+                parents[entry.get("@name")] = parent
+                entries.extend((child, entry.get("@name")) for child in as_list(entry.get("dg")))
+
+        return parents
+
+    def _fetch_device_group_inventory(self, action_result):
+        """Fetch the device groups with their parent and the serial numbers of their devices
+
+        Args:
+            action_result : Object of ActionResult class
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message),
+            dictionary of the parent and the devices keyed by device group
+        """
+        status, device_groups = self._get_device_group_records(action_result)
+        if phantom.is_fail(status):
+            return action_result.get_status(), None
+
+        parents = self._get_device_group_parents()
+
+        return phantom.APP_SUCCESS, {
+            device_group.name: {"parent": parents.get(device_group.name), "devices": device_group.devices or []}
+            for device_group in device_groups
+        }
+
+    def _cache_device_group_inventory(self, inventory):
+        """Store the device group inventory in the app state"""
+        self._connector.state[consts.DEVICE_GROUP_INVENTORY_STATE_KEY] = {
+            "host": self._connector.config[phantom.APP_JSON_DEVICE],
+            "device_groups": inventory,
+            "fetched": time.time(),
+        }
+        self._connector.is_state_updated = True
+
+    def _get_device_group_inventory(self, action_result, refresh=False):
+        """Return the device group inventory, from the app state when it was cached for the device
+
+        A stale inventory is still returned, and refreshed in the background for the next actions.
+        The refresh is joined by _join_device_group_refresh before the state is saved.
+
+        Args:
+            action_result : Object of ActionResult class
+            refresh : whether to fetch the inventory even if it is cached
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message),
+            dictionary of the parent and the devices keyed by device group
+        """
+        ttl = self._get_int_config("device_group_cache_ttl", consts.DEFAULT_DEVICE_GROUP_CACHE_TTL)
+        cache = self._connector.state.get(consts.DEVICE_GROUP_INVENTORY_STATE_KEY)
+
+        if (
+            not refresh
+            and isinstance(cache, dict)
+            and cache.get("host") == self._connector.config[phantom.APP_JSON_DEVICE]
+            and isinstance(cache.get("device_groups"), dict)
+        ):
+            if cache.get("fetched", 0) + ttl <= time.time():
+                self._start_device_group_refresh()
+            return phantom.APP_SUCCESS, cache["device_groups"]
+
+        self._join_device_group_refresh()
+
+        status, inventory = self._fetch_device_group_inventory(action_result)
+        if phantom.is_fail(status):
+            return action_result.get_status(), None
+
+        self._cache_device_group_inventory(inventory)
+        return phantom.APP_SUCCESS, inventory
+
+    def _start_device_group_refresh(self):
+        """Refresh the cached device group inventory in a background thread"""
+        if self._device_group_refresh:
+            return
+
+        def refresh():
+            status_action_result = ActionResult()
+            status, inventory = self._fetch_device_group_inventory(status_action_result)
+            if phantom.is_fail(status):
+                self._connector.debug_print(f"Failed to refresh the device group inventory. Reason: {status_action_result.get_message()}")
+                return
+            self._cache_device_group_inventory(inventory)
+
+        self._connector.debug_print("Refreshing the stale device group inventory in the background")
+        self._device_group_refresh = threading.Thread(target=refresh, name="device-group-refresh", daemon=True)
+        self._device_group_refresh.start()
+
+    def _join_device_group_refresh(self):
+        """Wait for the background refresh of the device group inventory, if any"""
+        if self._device_group_refresh:
+            self._device_group_refresh.join()
+            self._device_group_refresh = None
+
+    def _find_unknown_device_groups(self, device_groups):
+        """Return the device groups missing from the cached device group inventory
+
+        The inventory is fetched again when some are missing, in case they were created since it was cached.
+        None is returned when the inventory cache is disabled or could not be fetched.
+
+        Args:
+            device_groups : list of device group names
+
+        Returns:
+            list of the unknown device groups, None if they could not be checked
+        """
+        if not self._get_int_config("device_group_cache_ttl", consts.DEFAULT_DEVICE_GROUP_CACHE_TTL):
+            return None
+
+        unknown_device_groups = None
+        for refresh in (False, True):
+            status_action_result = ActionResult()
+            status, inventory = self._get_device_group_inventory(status_action_result, refresh)
+            if phantom.is_fail(status):
+                self._connector.debug_print(f"Failed to fetch the device group inventory. Reason: {status_action_result.get_message()}")
+                return None
+
+            unknown_device_groups = [device_group for device_group in device_groups if device_group not in inventory]
+            if not unknown_device_groups:
+                break
+
+        return unknown_device_groups
 
     def _get_device_commit_details_string(self, commit_all_device_details):
         if type(commit_all_device_details) == str:
@@ -484,7 +1526,23 @@ class PanoramaUtils:
                 self._connector.debug_print("Parsing commit all device details dict, ", self._get_error_message_from_exception(e))
                 return "UNKNOWN"
 
-    def _parse_device_group_job_response(self, job, action_result):
+    def _get_device_group_of_device(self, device):
+        """Return the device group a device result of a commit-all job belongs to, None if it is not reported"""
+        try:
+            return device["details"]["msg"]["@dgname"]
+        except Exception:
+            return None
+
+    def _parse_device_group_job_response(self, job, action_result, device_groups=None):
+        """Update the action result with the per device results of the finished commit-all job
+
+        When the job pushed several device groups, the device results are grouped by device group.
+
+        Args:
+            job : finished commit-all job
+            action_result : Object of ActionResult class
+            device_groups : list of the device groups pushed by the job, taken from the device results when not given
+        """
         status_string = ""
         device_group_status = phantom.APP_ERROR
 
@@ -505,52 +1563,90 @@ class PanoramaUtils:
         if isinstance(devices, dict):
             devices = [devices]
 
-        status_string = f"{status_string}<ul>"
-        if not devices:
-            status_string = f"{status_string}<li>No device status found, possible that no devices configured</li>"
-
-        for device in devices:
-            try:
-                if device["result"] != "FAIL":
-                    device_group_status |= phantom.APP_SUCCESS
-
-                device_status = "Device Name: {}, Result: {}, Details: {}".format(
-                    device["devicename"], device["result"], self._get_device_commit_details_string(device["details"])
-                )
-                status_string = f"{status_string}<li>{device_status}</li>"
-            except Exception as e:
-                self._connector.debug_print("Parsing commit all message for a single device, ", self._get_error_message_from_exception(e))
-
-        status_string = f"{status_string}</ul>"
+        if device_groups is None:
+            # the device groups of a job queried by id are the ones reported by its devices
+            device_groups = list(dict.fromkeys(filter(None, map(self._get_device_group_of_device, devices)))) or [job.get("dgname")]
 
-        status_string = "Commit status for device group '{}':\n{}".format(job["dgname"], status_string)
+        if len(device_groups) > 1:
+            devices_by_device_group = {device_group: [] for device_group in device_groups}
+            for device in devices:
+                device_group = self._get_device_group_of_device(device)
+                devices_by_device_group.setdefault(device_group if device_group in devices_by_device_group else None, []).append(device)
+        else:
+            devices_by_device_group = {job.get("dgname") or device_groups[0]: devices}
+
+        for device_group, device_group_devices in devices_by_device_group.items():
+            device_status_string = "<ul>"
+            if not device_group_devices:
+                device_status_string = f"{device_status_string}<li>No device status found, possible that no devices configured</li>"
+
+            for device in device_group_devices:
+                try:
+                    if device["result"] != "FAIL":
+                        device_group_status |= phantom.APP_SUCCESS
+
+                    device_status = "Device Name: {}, Result: {}, Details: {}".format(
+                        device["devicename"], device["result"], self._get_device_commit_details_string(device["details"])
+                    )
+                    device_status_string = f"{device_status_string}<li>{device_status}</li>"
+                except Exception as e:
+                    self._connector.debug_print("Parsing commit all message for a single device, ", self._get_error_message_from_exception(e))
+
+            device_status_string = f"{device_status_string}</ul>"
+
+            if device_group is None and len(devices_by_device_group) == 1:
+                status_string = f"{status_string}Commit status for the devices:\n{device_status_string}"
+            elif device_group is None:
+                status_string = f"{status_string}Commit status for the other devices:\n{device_status_string}"
+            else:
+                status_string = f"{status_string}Commit status for device group '{device_group}':\n{device_status_string}"
 
         return action_result.set_status(device_group_status, status_string)
 
-    def _commit_device_group(self, device_group, action_result):
-        """Commit changes for the Device group
+    def _submit_device_group_commit(self, device_groups, action_result, device_targets=None):
+        """Send the commit-all request pushing the changes to the Device groups
+
+        All the device groups are pushed by the single job created by the request.
+        The push of a device group listed in device_targets only reaches the given devices.
 
-        we then query the Commit job until it's finished to update the given action result.
+        Returns:
+            job id of the push, None if the request failed (the action result is updated with the failure)
         """
-        self._connector.debug_print(f"Committing Config changes for the device group '{device_group}'")
+        self._connector.debug_print(f"Committing Config changes for the device groups {device_groups}")
+
+        entries = ""
+        for device_group in device_groups:
+            if device_targets and device_targets.get(device_group):
+                devices = "".join(consts.COMMIT_ALL_DEVICE_ENTRY.format(dev_ser_num=serial) for serial in device_targets[device_group])
+                entries = f"{entries}{consts.COMMIT_ALL_DEV_GRP_DEV_ENTRY.format(device_group=device_group, devices=devices)}"
+            else:
+                entries = f"{entries}{consts.COMMIT_ALL_DEV_GRP_ENTRY.format(device_group=device_group)}"
+        cmd = consts.COMMIT_ALL_DEV_GRP_CMD.format(entries=entries)
 
-        cmd = f'<commit-all><shared-policy><device-group><entry name="{device_group}"/></device-group></shared-policy></commit-all>'
+        # Only a push submitted once the changes were committed can be reattached to
+        job_id = self._find_registered_job(consts.JOB_KIND_PUSH, cmd, self._commit_finished_time) if self._commit_finished_time else None
+        if job_id:
+            self._start_job_telemetry(job_id)
+            return job_id
 
         data = {"type": "commit", "action": "all", "cmd": cmd, "key": self._key}
 
         rest_call_action_result = ActionResult()
 
+        submit_time = time.time()
         status, _ = self._make_rest_call(data, rest_call_action_result)
 
         if phantom.is_fail(status):
-            return action_result.set_status(rest_call_action_result.get_status(), rest_call_action_result.get_message())
+            action_result.set_status(rest_call_action_result.get_status(), rest_call_action_result.get_message())
+            return None
 
         # Get the job id of the commit call from the result_data, also pop it since we don't need it
         # to be in the action result
         result_data = rest_call_action_result.get_data()
 
         if len(result_data) == 0:
-            return action_result.set_status(rest_call_action_result.get_status(), rest_call_action_result.get_message())
+            action_result.set_status(rest_call_action_result.get_status(), rest_call_action_result.get_message())
+            return None
 
         # We want to process the response from the Commit request we've just done
         # https://docs.paloaltonetworks.com/pan-os/9-0/pan-os-panorama-api/pan-os-xml-api-request-types/commit-configuration-api/commit.html#id4e36ab51-cce0-4bd1-8953-2413189ab1c6
@@ -559,57 +1655,156 @@ class PanoramaUtils:
         if not isinstance(result_data, dict):
             error_message = f"Failed to retrieve job id from {result_data}"
             self._connector.debug_print(error_message)
-            return action_result.set_status(phantom.APP_ERROR, error_message)
+            action_result.set_status(phantom.APP_ERROR, error_message)
+            return None
 
         job_id = result_data.get("job")
 
         if not job_id:
             self._connector.debug_print("Failed to find Job id")
-            return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_NO_JOB_ID)
+            return None
 
         self._connector.debug_print("commit job id: ", job_id)
 
-        while True:
-            data = {"type": "op", "key": self._key, "cmd": f"<show><jobs><id>{job_id}</id></jobs></show>"}
+        self._register_job(consts.JOB_KIND_PUSH, cmd, job_id)
+        self._start_job_telemetry(job_id, time.time() - submit_time)
+
+        return job_id
+
+    def _show_jobs(self, job_ids):
+        """Query the status of the given jobs
+
+        When more than one job is outstanding, a single <show><jobs><all/></jobs></show> call refreshes all of them,
+        so the status traffic doesn't grow with the number of jobs. The listing only gives a summary of the jobs,
+        without the per-device results of the pushes, so the finished jobs and the ones missing from the listing are queried by id.
+
+        Args:
+            job_ids : list of the job ids to query
 
+        Returns:
+            dictionary of the action result of the call and the job entry (None if not found) for every job id
+        """
+        jobs_status = {}
+
+        if len(job_ids) > 1:
             status_action_result = ActionResult()
+            status, _ = self._make_rest_call({"type": "op", "key": self._key, "cmd": consts.SHOW_ALL_JOBS_CMD}, status_action_result)
+            result_data = status_action_result.get_data()
+            if phantom.is_success(status) and result_data and isinstance(result_data[0], dict):
+                listed_jobs = {job.id: job.entry for job in from_entries(Job, result_data[0].get("job")) if job.status != "FIN"}
+                jobs_status = {job_id: (status_action_result, listed_jobs[job_id]) for job_id in job_ids if job_id in listed_jobs}
 
-            status, _ = self._make_rest_call(data, status_action_result)
+        missing_job_ids = [job_id for job_id in job_ids if job_id not in jobs_status]
+        responses = self._make_rest_calls(
+            [{"type": "op", "key": self._key, "cmd": f"<show><jobs><id>{job_id}</id></jobs></show>"} for job_id in missing_job_ids]
+        )
 
-            if phantom.is_fail(status):
+        for job_id, (status_action_result, _) in zip(missing_job_ids, responses):
+            result_data = status_action_result.get_data()
+            job = result_data[0].get("job") if result_data and isinstance(result_data[0], dict) else None
+            jobs_status[job_id] = (status_action_result, job)
+
+        return jobs_status
+
+    def _check_device_group_jobs(self, jobs, job_ids):
+        """Query the given push jobs once, the finished ones are removed from the jobs
+
+        Args:
+            jobs : dictionary of the job ids of the pushes still running, with their device groups and action result
+            job_ids : list of the job ids to query
+
+        Returns:
+            dictionary of the progress of the pushes still running
+        """
+        self._count_job_polls(job_ids)
+
+        progress = {}
+        for job_id, (status_action_result, job) in self._show_jobs(job_ids).items():
+            device_groups, action_result = jobs[job_id]
+
+            if phantom.is_fail(status_action_result.get_status()):
                 action_result.set_status(phantom.APP_SUCCESS, status_action_result.get_message())
-                return action_result.get_status()
+                del jobs[job_id]
+                continue
 
             self._connector.debug_print("status", status_action_result)
 
-            # get the result_data and the job status
-            result_data = status_action_result.get_data()
+            # get the job status
             try:
-                job = result_data[0]["job"]
                 job_status = job["status"]
                 self._connector.debug_print(f"Job status: {job_status}")
 
                 if job_status == "FIN":
                     self._connector.debug_print(f"Finished job: {job}")
-                    self._parse_device_group_job_response(job, action_result)
-                    action_result.update_summary({"commit_device_group": {"finished_job": job}})
-                    break
+                    self._unregister_job(job_id)
+                    self._parse_device_group_job_response(job, action_result, device_groups)
+                    telemetry = self._finish_job_telemetry(job, device_groups)
+                    action_result.update_summary({"commit_device_group": {"finished_job": job, "telemetry": telemetry}})
+                    self._connector.debug_print(f"Done committing Config changes for the device groups {device_groups}")
+                    del jobs[job_id]
+                    continue
             except Exception as e:
                 error = self._get_error_message_from_exception(e)
-                return action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
+                action_result.set_status(phantom.APP_ERROR, f"Error occurred while processing response from server. {error}")
+                del jobs[job_id]
+                continue
 
-            # send the % progress
-            self._connector.send_progress(consts.PAN_PROG_COMMIT_PROGRESS, progress=job.get("progress"))
+            progress[job_id] = job.get("progress")
 
-            time.sleep(2)
+        return progress
 
-        self._connector.debug_print(f"Done committing Config changes for the device group '{device_group}'")
+    def _commit_device_groups(self, device_group_batches, action_results, device_targets=None):
+        """Push the changes to the Device groups, each batch of device groups with its own commit-all job
 
-        return action_result.get_status()
+        Up to commit_parallelism pushes run at the same time and all their jobs are polled together,
+        so the wall time is bounded by the slowest push instead of the sum of all of them.
+        The batches still waiting to be submitted when the job_poll_timeout deadline is reached fail as not pushed.
+
+        Args:
+            device_group_batches : list of the lists of device groups pushed by a single commit-all
+            action_results : list of the action results to update, one per batch
+            device_targets : dictionary of the serial numbers of the devices to push per device group, the other device groups
+                are pushed to all their devices
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS of the last push
+        """
+        parallelism = self._get_int_config("commit_parallelism", consts.DEFAULT_COMMIT_PARALLELISM, min_value=1)
+
+        pending = list(zip(device_group_batches, action_results))
+        jobs = {}
+
+        def set_timed_out_jobs(job_ids):
+            for job_id in job_ids:
+                self._set_job_poll_timeout(jobs.pop(job_id)[1], job_id)
+
+        poller = PanoramaJobPoller(self, lambda job_ids: self._check_device_group_jobs(jobs, job_ids), on_timeout=set_timed_out_jobs)
+
+        def submit_jobs():
+            while pending and len(jobs) < parallelism:
+                device_groups, action_result = pending.pop(0)
+                job_id = self._submit_device_group_commit(device_groups, action_result, device_targets)
+                if job_id:
+                    jobs[job_id] = (device_groups, action_result)
+                    poller.add(job_id)
+
+        poller.wait(submit_jobs)
+
+        # the batches still queued at the deadline are not pushed at all
+        timeout = self._get_int_config("job_poll_timeout", consts.DEFAULT_JOB_POLL_TIMEOUT)
+        for device_groups, action_result in pending:
+            action_result.update_summary({"not_pushed_device_groups": device_groups})
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_PUSH_NOT_SUBMITTED.format(device_groups=device_groups, timeout=timeout))
+
+        return action_results[-1].get_status()
 
     def _commit_and_commit_all(self, param, action_result):
         """Commit Config changes and Commit Device Group changes
 
+        With a commit coalescing window configured, the commit is shared with the other actions requesting one.
+        When the wait_for_completion parameter is false, the jobs are submitted and their ids returned without waiting for them.
+
         Args:
             param : Dictionary of parameters
             action_result : Object of ActionResult class
@@ -617,14 +1812,145 @@ class PanoramaUtils:
         Returns:
             Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message)
         """
+        if not param.get(consts.PAN_JSON_WAIT_FOR_COMPLETION, True):
+            return self._submit_commit_and_commit_all(param, action_result)
 
-        self._connector.debug_print("Start Commit actions")
+        window = self._get_int_config("commit_coalesce_window", consts.DEFAULT_COMMIT_COALESCE_WINDOW)
+        # the coalesced commits push whole device groups, so the targeted pushes are run on their own
+        if window and not param.get(consts.PAN_JSON_DEVICES):
+            return self._coalesce_commit(param, action_result, window)
 
-        status = self._commit_config(param, action_result)
+        return self._run_commit_and_commit_all(param, action_result)
 
-        if phantom.is_fail(status):
-            return action_result.get_status()
+    def _get_coalesced_commit_param(self, requests):
+        """Return the commit parameters covering all the given commit requests
+
+        The pushes cover the device groups of all the requests, all the device groups when a 'shared' request has no subset.
+        """
+        device_groups = []
+        push_all = False
+        shared_subset = False
+
+        for request in requests:
+            if request["device_group"].lower() != consts.PAN_DEV_GRP_SHARED:
+                device_groups.append(request["device_group"])
+            elif request.get("device_groups"):
+                device_groups.extend(request["device_groups"])
+                shared_subset = True
+            else:
+                push_all = True
+
+        device_groups = list(dict.fromkeys(device_groups))
+        param = {
+            # partial commits only include the changes of the asset user, which all the requests share
+            "use_partial_commit": all(request["use_partial_commit"] for request in requests),
+            consts.PAN_JSON_DEVICE_GRP: consts.PAN_DEV_GRP_SHARED if push_all else device_groups[0],
+        }
+
+        if not push_all and (shared_subset or len(device_groups) > 1):
+            param[consts.PAN_JSON_DEVICE_GRP] = consts.PAN_DEV_GRP_SHARED
+            param[consts.PAN_JSON_DEVICE_GROUPS] = ",".join(device_groups)
+
+        return param
+
+    def _lead_coalesced_commit(self, coalescer, window):
+        """Wait for the window, then commit all the recorded requests at once and publish the outcome
+
+        The requests left without an outcome by a previous leader, which was stopped while committing them, are committed again.
+
+        Returns:
+            True if requests were committed, False if there were none
+        """
+        for request_id, request in coalescer.requeue_orphaned_requests().items():
+            self._connector.debug_print(
+                f"Committing again the request {request_id} taken at {request.get('taken')} by the stopped leader {request.get('leader_pid')}"
+            )
+
+        time.sleep(window)
+
+        requests = coalescer.take_requests()
+        if not requests:
+            return False
+
+        param = self._get_coalesced_commit_param(list(requests.values()))
+        self._connector.debug_print(f"Committing {len(requests)} coalesced commit requests with {param}")
+
+        # the commit covers the config touched by all the actions, it is not scoped when one of them touched none
+        scopes = [request.get("config_scopes") for request in requests.values()]
+        self._config_scopes = set().union(*scopes) if all(scopes) else set()
+
+        commit_action_result = ActionResult(dict(param))
+        try:
+            self._run_commit_and_commit_all(param, commit_action_result)
+        except Exception as e:
+            commit_action_result.set_status(phantom.APP_ERROR, self._get_error_message_from_exception(e))
+
+        summary = dict(commit_action_result.get_summary() or {})
+        summary["coalesced_commit"] = {"requests": len(requests), "device_group": param[consts.PAN_JSON_DEVICE_GRP]}
+        if param.get(consts.PAN_JSON_DEVICE_GROUPS):
+            summary["coalesced_commit"]["device_groups"] = param[consts.PAN_JSON_DEVICE_GROUPS]
+
+        coalescer.publish_results(
+            list(requests),
+            {"status": bool(commit_action_result.get_status()), "message": commit_action_result.get_message(), "summary": summary},
+        )
+        return True
+
+    def _coalesce_commit(self, param, action_result, window):
+        """Record the commit request in the ledger shared by the actions, and wait for a leader to commit it
+
+        The action taking the leader lock commits all the requests recorded during the window.
+        A request still waiting for a leader after commit_coalesce_max_wait seconds is committed by its own action,
+        a request taken by a leader which stopped before publishing the outcome is committed by the next leader.
+        """
+        max_wait = self._get_int_config("commit_coalesce_max_wait", consts.DEFAULT_COMMIT_COALESCE_MAX_WAIT)
+        coalescer = PanoramaCommitCoalescer(self._connector.get_state_dir(), self._connector.config[phantom.APP_JSON_DEVICE])
+
+        device_groups = [value.strip() for value in (param.get(consts.PAN_JSON_DEVICE_GROUPS) or "").split(",") if value.strip()]
+        if param[consts.PAN_JSON_DEVICE_GRP].lower() != consts.PAN_DEV_GRP_SHARED:
+            # the subset only applies to the 'shared' pushes
+            device_groups = []
+        elif device_groups:
+            # an unknown device group would fail the commit shared with the other requests, it is checked beforehand
+            status, _ = self._get_commit_device_group_batches(param, action_result)
+            if phantom.is_fail(status):
+                return action_result.get_status()
+
+        request_id = coalescer.register(
+            param[consts.PAN_JSON_DEVICE_GRP], param.get("use_partial_commit", False), sorted(self._config_scopes), device_groups
+        )
+        deadline = time.time() + max_wait
+
+        while True:
+            result = coalescer.get_result(request_id)
+            if result is not None:
+                action_result.update_summary(result["summary"])
+                return action_result.set_status(phantom.APP_SUCCESS if result["status"] else phantom.APP_ERROR, result["message"])
+
+            if time.time() >= deadline and coalescer.withdraw(request_id):
+                self._connector.debug_print("No leader committed the request in time, committing it")
+                return self._run_commit_and_commit_all(param, action_result)
+
+            if coalescer.try_lead():
+                try:
+                    committed = self._lead_coalesced_commit(coalescer, min(window, max(deadline - time.time(), 0)))
+                finally:
+                    coalescer.release_lead()
+                if committed:
+                    continue
+
+            time.sleep(consts.COMMIT_COALESCE_POLL_INTERVAL)
+
+    def _get_commit_device_group_batches(self, param, action_result):
+        """Return the batches of device groups to push, each batch being pushed by a single commit-all job
+
+        Args:
+            param : Dictionary of parameters
+            action_result : Object of ActionResult class
 
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), list of the device group batches
+        """
         device_group = param[consts.PAN_JSON_DEVICE_GRP]
         device_groups = [device_group]
 
@@ -634,38 +1960,341 @@ class PanoramaUtils:
             # get all the device groups
             status, device_groups = self._get_all_device_groups(param, action_result)
             if phantom.is_fail(status):
-                return action_result.get_status()
+                return action_result.get_status(), []
+
+            # only push the requested subset of the device groups
+            device_groups_subset = [value.strip() for value in (param.get(consts.PAN_JSON_DEVICE_GROUPS) or "").split(",") if value.strip()]
+            if device_groups_subset:
+                unknown_device_groups = [value for value in device_groups_subset if value not in device_groups]
+                if unknown_device_groups and self._get_int_config("device_group_cache_ttl", consts.DEFAULT_DEVICE_GROUP_CACHE_TTL):
+                    # the cached inventory may predate the device groups
+                    status, device_groups = self._get_all_device_groups(param, action_result, refresh=True)
+                    if phantom.is_fail(status):
+                        return action_result.get_status(), []
+                    unknown_device_groups = [value for value in device_groups_subset if value not in device_groups]
+                if unknown_device_groups:
+                    return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_UNKNOWN_DEVICE_GROUPS.format(unknown_device_groups)), []
+                device_groups = list(dict.fromkeys(device_groups_subset))
 
         if not device_groups:
             error_message = "Got empty device group list"
             self._connector.debug_print(error_message)
-            return action_result.set_status(phantom.APP_ERROR, error_message)
-
-        # Reset the action_result object to error
-        action_result.set_status(phantom.APP_ERROR)
+            return action_result.set_status(phantom.APP_ERROR, error_message), []
 
         self._connector.debug_print(f"Processing device groups: {device_groups}")
 
-        dev_groups_ar = []
+        if self._connector.config.get("use_single_commit_all", False):
+            # a single commit-all job pushes all the device groups
+            return phantom.APP_SUCCESS, [device_groups]
+
+        return phantom.APP_SUCCESS, [[device_group] for device_group in device_groups]
+
+    def _has_pending_changes(self):
+        """Check whether the candidate configuration has changes to commit
+
+        Returns:
+            True/False, None if the check failed
+        """
+        status_action_result = ActionResult()
+        status, _ = self._make_rest_call({"type": "op", "key": self._key, "cmd": consts.CHECK_PENDING_CHANGES_CMD}, status_action_result)
+        result_data = status_action_result.get_data()
+
+        if phantom.is_fail(status) or not result_data:
+            self._connector.debug_print(f"Failed to check the pending changes. Reason: {status_action_result.get_message()}")
+            return None
+
+        return get_text(result_data[0]) != "no"
+
+    def _get_device_group_sync_state(self):
+        """Return the sync state of the devices of every device group
+
+        Returns:
+            dictionary of the shared policy status of every device serial number, keyed by device group,
+            None if the sync state could not be fetched
+        """
+        status_action_result = ActionResult()
+        status, _ = self._make_rest_call({"type": "op", "key": self._key, "cmd": consts.SHOW_DEVICE_GROUPS_CMD}, status_action_result)
+        result_data = status_action_result.get_data()
+
+        if phantom.is_fail(status) or not result_data or not isinstance(result_data[0], dict):
+            self._connector.debug_print(f"Failed to fetch the device group sync state. Reason: {status_action_result.get_message()}")
+            return None
+
+        return {
+            entry.get("@name"): {
+                device.get("@name"): get_text(get_child(device, "shared-policy-status"))
+                for device in as_list(get_child(entry.get("devices"), "entry"))
+                if isinstance(device, dict)
+            }
+            for entry in as_list(get_child(result_data[0].get("devicegroups"), "entry"))
+            if isinstance(entry, dict)
+        }
+
+    def _select_push_targets(self, device_group_batches, param, action_result, use_sync_state=True):
+        """Narrow the pushes down to the devices needing them
+
+        The pushes are limited to the devices of the devices parameter. With the sync state of the devices,
+        the device groups whose devices are all in sync are dropped (skip_noop_commits), or only the devices
+        out of sync are pushed (auto_target_devices). The skipped device groups are recorded in the summary.
+
+        Args:
+            device_group_batches : list of the lists of device groups pushed by a single commit-all
+            param : Dictionary of parameters
+            action_result : Object of ActionResult class
+            use_sync_state : whether the sync state reflects the committed changes
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), the remaining device group batches,
+            dictionary of the serial numbers of the devices to push per device group (None when the whole device groups are pushed)
+        """
+        devices = list(dict.fromkeys(value.strip() for value in (param.get(consts.PAN_JSON_DEVICES) or "").split(",") if value.strip()))
+        skip_synced_device_groups = use_sync_state and self._connector.config.get("skip_noop_commits", False)
+        auto_target_devices = use_sync_state and self._connector.config.get("auto_target_devices", False)
+
+        if not (devices or skip_synced_device_groups or auto_target_devices):
+            return phantom.APP_SUCCESS, device_group_batches, None
+
+        sync_state = self._get_device_group_sync_state()
+
+        if sync_state is None:
+            if devices:
+                return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_DEVICE_GROUP_SYNC_STATE), [], None
+            return phantom.APP_SUCCESS, device_group_batches, None
+
+        device_groups = [device_group for device_groups in device_group_batches for device_group in device_groups]
+
+        if devices:
+            known_devices = {serial for device_group in device_groups for serial in sync_state.get(device_group, {})}
+            unknown_devices = [serial for serial in devices if serial not in known_devices]
+            if unknown_devices:
+                return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_UNKNOWN_DEVICES.format(unknown_devices)), [], None
+
+        targets = {}
         for device_group in device_groups:
-            dev_grp_ar = ActionResult()
-            dev_groups_ar.append(dev_grp_ar)
-            self._commit_device_group(device_group, dev_grp_ar)
+            members = sync_state.get(device_group, {})
+            selected = [serial for serial in members if not devices or serial in devices]
+
+            if skip_synced_device_groups or auto_target_devices:
+                out_of_sync = [serial for serial in selected if members[serial] != consts.DEVICE_GROUP_IN_SYNC]
+                selected = out_of_sync if auto_target_devices or not out_of_sync else selected
+
+            targets[device_group] = selected
+
+        skipped_device_groups = [device_group for device_group in device_groups if not targets[device_group]]
+        if skipped_device_groups:
+            self._connector.debug_print(f"No device to push in the device groups {skipped_device_groups}, skipping their push")
+            action_result.update_summary({"skipped_device_groups": skipped_device_groups})
+
+        device_targets = None
+        if devices or auto_target_devices:
+            device_targets = {device_group: serials for device_group, serials in targets.items() if serials}
+            action_result.update_summary({"targeted_devices": device_targets})
+
+        device_group_batches = [
+            [device_group for device_group in device_groups if targets[device_group]] for device_groups in device_group_batches
+        ]
+        return phantom.APP_SUCCESS, [device_groups for device_groups in device_group_batches if device_groups], device_targets
+
+    def _run_commit_and_commit_all(self, param, action_result):
+        """Commit Config changes, then push them to the device group (or all the device groups for 'shared')"""
+
+        self._connector.debug_print("Start Commit actions")
+
+        skip_commit = self._connector.config.get("skip_noop_commits", False) and self._has_pending_changes() is False
+
+        if skip_commit:
+            self._connector.debug_print("No pending changes, skipping the commit")
+            action_result.update_summary({"skipped_commit_config": True})
+        else:
+            status = self._commit_config(param, action_result)
+
+            if phantom.is_fail(status):
+                return action_result.get_status()
+
+        status, device_group_batches = self._get_commit_device_group_batches(param, action_result)
+        if phantom.is_fail(status):
+            return action_result.get_status()
+
+        status, device_group_batches, device_targets = self._select_push_targets(device_group_batches, param, action_result)
+        if phantom.is_fail(status):
+            return action_result.get_status()
+
+        if not device_group_batches:
+            return action_result.set_status(
+                phantom.APP_SUCCESS, consts.PAN_SUCCESS_NO_PENDING_CHANGES if skip_commit else consts.PAN_SUCCESS_DEVICE_GROUPS_IN_SYNC
+            )
+
+        # Reset the action_result object to error
+        action_result.set_status(phantom.APP_ERROR)
+
+        dev_groups_ar = [ActionResult() for _ in device_group_batches]
+        self._commit_device_groups(device_group_batches, dev_groups_ar, device_targets)
 
         status = phantom.APP_ERROR
-        status_message = ""
+        status_messages = []
 
         for dev_group_ar in dev_groups_ar:
             status |= dev_group_ar.get_status()
-            status_message = f"{status_message}{dev_group_ar.get_message()}"
+            status_messages.append(dev_group_ar.get_message())
+
+        status_message = "\n".join(status_messages)
 
         action_result.set_status(status, status_message)
-        action_result.update_summary({"commit_device_groups": [dev_grp_ar.get_summary()["commit_device_group"] for dev_grp_ar in dev_groups_ar]})
+        # the pushes which failed to submit or timed out only have their message
+        commit_device_groups = [(dev_grp_ar.get_summary() or {}).get("commit_device_group") for dev_grp_ar in dev_groups_ar]
+        action_result.update_summary({"commit_device_groups": [summary for summary in commit_device_groups if summary]})
+        not_pushed_device_groups = [
+            device_group for dev_grp_ar in dev_groups_ar for device_group in (dev_grp_ar.get_summary() or {}).get("not_pushed_device_groups", [])
+        ]
+        if not_pushed_device_groups:
+            # the action fails even if the pushes submitted in time succeeded
+            action_result.set_status(phantom.APP_ERROR, status_message)
+            action_result.update_summary({"not_pushed_device_groups": not_pushed_device_groups})
+        if self._reattached_job_ids:
+            action_result.update_summary({"reattached_jobs": self._reattached_job_ids})
+
+        history_keys = [consts.COMMIT_HISTORY_COMMIT_KEY] + [
+            device_group for device_groups in device_group_batches for device_group in device_groups
+        ]
+        action_result.update_summary({"commit_history": self._get_commit_history_summary(history_keys)})
 
         self._connector.debug_print("Done Commit actions")
 
         return action_result.get_status()
 
+    def _submit_commit_and_commit_all(self, param, action_result):
+        """Submit the commit and the pushes to the device groups without waiting for their jobs
+
+        The device queues the commit-all jobs behind the commit job, so the pushes are sent right away.
+        The ids of the submitted jobs are returned in the action result, for the 'get job status' and 'wait for jobs' actions.
+        """
+        self._connector.debug_print("Start submitting the Commit jobs")
+
+        submitted_jobs = []
+        skip_commit = self._connector.config.get("skip_noop_commits", False) and self._has_pending_changes() is False
+
+        if skip_commit:
+            self._connector.debug_print("No pending changes, skipping the commit")
+            action_result.update_summary({"skipped_commit_config": True})
+        else:
+            # the submitted jobs must include the pending changes, so no earlier commit is reattached to
+            job_id = self._submit_commit_config(param, action_result, reattach=False)
+
+            if job_id:
+                submitted_jobs.append({"job_id": job_id, "type": consts.COMMIT_JOB_TYPE})
+            elif phantom.is_success(action_result.get_status()):
+                # the device creates no job when there is nothing to commit, the pushes are still submitted like in _commit_config
+                self._connector.debug_print("Nothing to commit, no commit job was created")
+                action_result.update_summary({"skipped_commit_config": True})
+                skip_commit = True
+            else:
+                return action_result.get_status()
+
+        status, device_group_batches = self._get_commit_device_group_batches(param, action_result)
+
+        device_targets = None
+        if phantom.is_success(status):
+            # the sync state of the devices only reflects the changes when there is no commit to wait for
+            status, device_group_batches, device_targets = self._select_push_targets(
+                device_group_batches, param, action_result, use_sync_state=skip_commit
+            )
+            if phantom.is_success(status) and not device_group_batches:
+                return action_result.set_status(phantom.APP_SUCCESS, consts.PAN_SUCCESS_NO_PENDING_CHANGES)
+
+        for device_groups in device_group_batches if phantom.is_success(status) else []:
+            push_action_result = ActionResult()
+            push_job_id = self._submit_device_group_commit(device_groups, push_action_result, device_targets)
+            if not push_job_id:
+                status = action_result.set_status(push_action_result.get_status(), push_action_result.get_message())
+                break
+
+            submitted_jobs.append({"job_id": push_job_id, "type": consts.PUSH_JOB_TYPE, "device_groups": device_groups})
+
+        action_result.update_data(submitted_jobs)
+        action_result.update_summary({"submitted_jobs": [submitted_job["job_id"] for submitted_job in submitted_jobs]})
+
+        if phantom.is_fail(status):
+            return action_result.get_status()
+
+        return action_result.set_status(
+            phantom.APP_SUCCESS, consts.PAN_SUCCESS_COMMIT_JOBS_SUBMITTED.format(", ".join(job["job_id"] for job in submitted_jobs))
+        )
+
+    def _add_job_status(self, job, action_result):
+        """Update the action result with the outcome of the given finished job, according to its type"""
+        if job.get("type") == consts.PUSH_JOB_TYPE:
+            self._parse_device_group_job_response(job, action_result)
+        elif job.get("type") == consts.COMMIT_JOB_TYPE:
+            self._add_commit_status(job, action_result)
+        elif job.get("result") == "OK":
+            action_result.set_status(phantom.APP_SUCCESS, consts.PAN_JOB_RESULT.format(job_id=job.get("id"), result=job.get("result")))
+        else:
+            action_result.set_status(phantom.APP_ERROR, consts.PAN_JOB_RESULT.format(job_id=job.get("id"), result=job.get("result")))
+
+        return action_result.get_status()
+
+    def _wait_for_jobs(self, job_ids, action_result):
+        """Wait for the given jobs to finish and update the action result with their outcome
+
+        Args:
+            job_ids : list of the job ids to wait for
+            action_result : Object of ActionResult class
+
+        Returns:
+            Status phantom.APP_ERROR/phantom.APP_SUCCESS(along with appropriate message), success when all the jobs succeeded
+        """
+        job_action_results = {job_id: ActionResult() for job_id in job_ids}
+        finished_jobs = {}
+
+        def check_jobs(outstanding_job_ids):
+            progress = {}
+            for job_id, (status_action_result, job) in self._show_jobs(outstanding_job_ids).items():
+                if phantom.is_fail(status_action_result.get_status()):
+                    job_action_results[job_id].set_status(phantom.APP_ERROR, status_action_result.get_message())
+                elif not isinstance(job, dict):
+                    job_action_results[job_id].set_status(phantom.APP_ERROR, consts.PAN_ERROR_JOB_NOT_FOUND.format(job_id=job_id))
+                elif job.get("status") == "FIN":
+                    self._connector.debug_print(f"Finished job: {job}")
+                    finished_jobs[job_id] = job
+                    try:
+                        self._add_job_status(job, job_action_results[job_id])
+                    except Exception as e:
+                        error = self._get_error_message_from_exception(e)
+                        job_action_results[job_id].set_status(
+                            phantom.APP_ERROR, f"Error occurred while processing response from server. {error}"
+                        )
+                else:
+                    progress[job_id] = job.get("progress")
+            return progress
+
+        def set_timed_out_jobs(timed_out_job_ids):
+            for job_id in timed_out_job_ids:
+                self._set_job_poll_timeout(job_action_results[job_id], job_id)
+
+        poller = PanoramaJobPoller(self, check_jobs, on_timeout=set_timed_out_jobs)
+        for job_id in job_ids:
+            poller.add(job_id)
+        poller.wait()
+
+        status = phantom.APP_SUCCESS
+        status_message = ""
+
+        for job_id, job_action_result in job_action_results.items():
+            action_result.add_data(finished_jobs.get(job_id, {"id": job_id}))
+            if phantom.is_fail(job_action_result.get_status()):
+                status = phantom.APP_ERROR
+            status_message = f"{status_message}Job {job_id}: {job_action_result.get_message()}\n"
+
+        action_result.update_summary(
+            {
+                "total_jobs": len(job_ids),
+                "finished_jobs": len(finished_jobs),
+                "failed_jobs": sum(phantom.is_fail(job_action_result.get_status()) for job_action_result in job_action_results.values()),
+            }
+        )
+
+        return action_result.set_status(status, status_message.strip())
+
     def _get_security_policy_xpath(self, param, action_result):
         """Return the xpath to the given Security Policy name"""
         try:
@@ -697,7 +2326,7 @@ class PanoramaUtils:
         if phantom.is_fail(status):
             return action_result.get_status()
 
-        data = {"type": "config", "action": "get", "key": self._key, "xpath": rules_xpath}
+        data = {"type": "config", "action": "get", "key": self._key, "xpath": consts.NAME_PROJECTION_XPATH.format(xpath=rules_xpath)}
 
         status, response = self._make_rest_call(data, action_result)
         action_result.update_summary({"does_policy_exist": response})
@@ -744,7 +2373,7 @@ class PanoramaUtils:
 
         get_add_grp_xpath = f"{consts.ADDR_GRP_XPATH.format(config_xpath=self._get_config_xpath(param), ip_group_name=add_grp_name)}"
 
-        data = {"type": "config", "action": "get", "key": self._key, "xpath": get_add_grp_xpath}
+        data = {"type": "config", "action": "get", "key": self._key, "xpath": consts.NAME_PROJECTION_XPATH.format(xpath=get_add_grp_xpath)}
 
         status, _ = self._make_rest_call(data, action_result)
         if phantom.is_fail(status):
@@ -784,7 +2413,7 @@ class PanoramaUtils:
 
         get_address_xpath = f"{consts.ADDRESS_XPATH.format(config_xpath=self._get_config_xpath(param), name=address_name)}"
 
-        data = {"type": "config", "action": "get", "key": self._key, "xpath": get_address_xpath}
+        data = {"type": "config", "action": "get", "key": self._key, "xpath": consts.NAME_PROJECTION_XPATH.format(xpath=get_address_xpath)}
 
         status, _ = self._make_rest_call(data, action_result)
         if phantom.is_fail(status):
@@ -806,44 +2435,6 @@ class PanoramaUtils:
 
         return phantom.APP_SUCCESS
 
-    def _does_tag_exist(self, param, tag, action_result):
-        """Checking the tag is exist or not
-
-        Args:
-            param : Dictionary of parameters
-            action_result : Object of ActionResult class
-
-        Returns:
-            Status phantom.APP_ERROR/phantom.APP_SUCCESS, true if tag existing else false
-        """
-
-        self._connector.debug_print("Checking the tag is exist or not...")
-
-        get_tag_xpath = f"""{consts.GET_TAG_XPATH.format(config_xpath=self._get_config_xpath(param), name=tag)}"""
-
-        data = {"type": "config", "action": "get", "key": self._key, "xpath": get_tag_xpath}
-
-        status, _ = self._make_rest_call(data, action_result)
-        if phantom.is_fail(status):
-            self._connector.debug_print(f"Error occur while checking the existence of tag. Error - {action_result.get_message()}")
-            return phantom.APP_ERROR
-
-        result_data = action_result.get_data().pop()
-
-        if result_data.get("@total-count") == "0":
-            self._connector.debug_print("No Tag found")
-            return phantom.APP_ERROR
-
-        try:
-            result_data = result_data.get("entry")
-        except Exception as e:
-            error = self._get_error_message_from_exception(e)
-            self._connector.debug_print(f"Error occurred while processing response from server. {error}")
-            return phantom.APP_ERROR
-        self._connector.debug_print("out from Checking the tag is exist or not...")
-
-        return phantom.APP_SUCCESS
-
     def _update_security_policy(self, param, sec_policy_type, action_result, name=None, use_source=False):
         """
         Perform any Policy updates on the xpath to the given Security Policy name
@@ -985,7 +2576,7 @@ class PanoramaUtils:
         result = response.get("result")
 
         if result is not None:
-            self._connector.debug_print(f"action_result.add_data: response_dict: {response_dict}")
+            self._debug_print_data("action_result.add_data: response_dict: ", response_dict)
             action_result.add_data(result)
 
         return action_result.get_status()
@@ -1176,9 +2767,118 @@ class PanoramaUtils:
         temp_element = f"<{param_name}>{param_val}</{param_name}>"
         return status, temp_element
 
+    def _get_tag_cache_scopes(self):
+        """Return the tag names cached in the app state, keyed by lookup xpath, dropping the expired ones"""
+        ttl = self._get_int_config("tag_cache_ttl", consts.DEFAULT_TAG_CACHE_TTL)
+        cache = self._connector.state.get(consts.TAG_CACHE_STATE_KEY)
+
+        if not ttl or not isinstance(cache, dict) or cache.get("host") != self._connector.config[phantom.APP_JSON_DEVICE]:
+            return {}
+
+        now = time.time()
+        return {
+            xpath: scope
+            for xpath, scope in (cache.get("scopes") or {}).items()
+            if isinstance(scope, dict) and scope.get("fetched", 0) + ttl > now
+        }
+
+    def _cache_tags(self, lookup_xpath, tags):
+        """Record the tag names found by the lookup xpath, for the rest of the action and in the app state when enabled"""
+        self._tag_cache[lookup_xpath] = set(tags)
+
+        if not self._get_int_config("tag_cache_ttl", consts.DEFAULT_TAG_CACHE_TTL):
+            return
+
+        scopes = self._get_tag_cache_scopes()
+        fetched = scopes.get(lookup_xpath, {}).get("fetched", time.time())
+        scopes[lookup_xpath] = {"tags": sorted(tags), "fetched": fetched}
+        self._connector.state[consts.TAG_CACHE_STATE_KEY] = {"host": self._connector.config[phantom.APP_JSON_DEVICE], "scopes": scopes}
+        self._connector.is_state_updated = True
+
+    def _get_tag_lookup_xpath(self, config_xpaths):
+        """Return the xpath selecting the names of the tags under all the given config xpaths"""
+        return consts.XPATH_UNION.join(
+            consts.ENTRY_NAME_PROJECTION_XPATH.format(xpath=consts.TAG_XPATH.format(config_xpath=config_xpath)) for config_xpath in config_xpaths
+        )
+
+    def _get_existing_tags(self, config_xpaths):
+        """Return the names of the tags defined under the given config xpaths
+
+        The tags of all the xpaths are fetched with a single call selecting their union, and cached for the rest of the action
+        (and for tag_cache_ttl seconds in the app state), so the tags of several objects are resolved once.
+
+        Args:
+            config_xpaths : list of config xpaths, the device group and shared ones
+
+        Returns:
+            set of tag names, empty if they could not be fetched (the tags are then treated as missing)
+        """
+        lookup_xpath = self._get_tag_lookup_xpath(config_xpaths)
+
+        if lookup_xpath not in self._tag_cache:
+            state_scopes = self._get_tag_cache_scopes()
+            if lookup_xpath in state_scopes:
+                self._tag_cache[lookup_xpath] = set(state_scopes[lookup_xpath].get("tags") or [])
+
+        if lookup_xpath in self._tag_cache:
+            return self._tag_cache[lookup_xpath]
+
+        tag_action_result = ActionResult()
+        status, _ = self._make_rest_call({"type": "config", "action": "get", "key": self._key, "xpath": lookup_xpath}, tag_action_result)
+        result_data = tag_action_result.get_data()
+
+        if phantom.is_fail(status) or not result_data or not isinstance(result_data[-1], dict):
+            self._connector.debug_print(f"Failed to fetch the tags of {config_xpaths}. Reason: {tag_action_result.get_message()}")
+            return set()
+
+        self._cache_tags(lookup_xpath, [entry.get("@name") for entry in as_list(result_data[-1].get("entry")) if isinstance(entry, dict)])
+        return self._tag_cache[lookup_xpath]
+
+    def _get_covering_tag_lookups(self, config_xpath):
+        """Return the cached lookup xpaths covering the tags of the config xpath, with the lookups cached in the app state"""
+        tags_xpath = self._get_tag_lookup_xpath([config_xpath])
+        state_scopes = self._get_tag_cache_scopes()
+        lookup_xpaths = [
+            lookup_xpath for lookup_xpath in set(self._tag_cache) | set(state_scopes) if tags_xpath in lookup_xpath.split(consts.XPATH_UNION)
+        ]
+        return lookup_xpaths, state_scopes
+
+    def _add_created_tags(self, config_xpath, tags):
+        """Add the tags created under the config xpath to the cached lookups covering it"""
+        lookup_xpaths, state_scopes = self._get_covering_tag_lookups(config_xpath)
+
+        for lookup_xpath in lookup_xpaths:
+            cached_tags = self._tag_cache.get(lookup_xpath)
+            if cached_tags is None:
+                cached_tags = set(state_scopes[lookup_xpath].get("tags") or [])
+            self._cache_tags(lookup_xpath, cached_tags | set(tags))
+
+    def _drop_written_tag_scopes(self):
+        """Drop the cached tags of the scopes the action wrote tags to, the writes may not have been applied
+
+        Called when the action fails, e.g. the batched tag creation or the write of the tagged object failed.
+        """
+        write_scopes, self._tag_write_scopes = self._tag_write_scopes, set()
+
+        for config_xpath in write_scopes:
+            lookup_xpaths, state_scopes = self._get_covering_tag_lookups(config_xpath)
+            for lookup_xpath in lookup_xpaths:
+                self._connector.debug_print(f"Dropping the cached tags of {lookup_xpath}")
+                self._tag_cache.pop(lookup_xpath, None)
+                state_scopes.pop(lookup_xpath, None)
+
+            if lookup_xpaths and self._get_int_config("tag_cache_ttl", consts.DEFAULT_TAG_CACHE_TTL):
+                self._connector.state[consts.TAG_CACHE_STATE_KEY] = {
+                    "host": self._connector.config[phantom.APP_JSON_DEVICE],
+                    "scopes": state_scopes,
+                }
+                self._connector.is_state_updated = True
+
     def _create_tag(self, connector, action_result, param, tags, comment=consts.TAG_COMMENT, color=None):
         """Create tag based on provided parameters
 
+        The tags of the device group and of shared are looked up with a single call, and the missing ones are created in one call.
+
         Args:
             connector: phantom connector object
             action_result: Object of ActionResult class
@@ -1194,38 +2894,48 @@ class PanoramaUtils:
         xml_tag_string = None
         if tags:
             xml_tag_string = "<tag>"
+            config_xpath = self._get_config_xpath(param)
 
-            for tag in tags:
-                connector.debug_print(f"Creating - {tag} tag...")
-                tag_status = self._does_tag_exist(param, tag, action_result)
-                if tag_status:
-                    connector.debug_print(f"Tag - {tag} already present, Skipping creating tag...")
-                    xml_tag_string += f"<member>{tag}</member>"
-                    continue
-
-                element_xml = consts.START_TAG.format(tag=tag)
-                if color:
-                    element_xml += f"<color>{color}</color>"
-                if comment:
-                    element_xml += f"<comments>{comment}</comments>"
-                element_xml += consts.END_TAG
+            # The tags of shared can be used by the objects of every device group
+            config_xpaths = list(dict.fromkeys([config_xpath, "/config/shared"]))
+            connector.debug_print(f"Checking the existence of tags: {tags}")
+            existing_tags = self._get_existing_tags(config_xpaths)
+
+            missing_tags = [tag for tag in dict.fromkeys(tags) if tag not in existing_tags]
+            if missing_tags:
+                connector.debug_print(f"Creating tags: {missing_tags}")
+                element_xml = ""
+                for tag in missing_tags:
+                    element_xml += consts.START_TAG.format(tag=tag)
+                    if color:
+                        element_xml += f"<color>{color}</color>"
+                    if comment:
+                        element_xml += f"<comments>{comment}</comments>"
+                    element_xml += consts.END_TAG
 
                 data = {
                     "type": "config",
                     "action": "set",
                     "key": self._key,
-                    "xpath": consts.TAG_XPATH.format(config_xpath=self._get_config_xpath(param)),
+                    "xpath": consts.TAG_XPATH.format(config_xpath=config_xpath),
                     "element": element_xml,
                 }
-                status, response = self._make_rest_call(data, action_result)
-                summary = {"add_tag": response}
-                if phantom.is_fail(status):
-                    action_result.update_summary({"add_address_entry": summary})
-                    return action_result.get_status(), None
+                self._tag_write_scopes.add(config_xpath)
+
+                if self._config_batch is not None:
+                    # The tags are created along with the other requests of the batch
+                    self._queue_config_request(data, action_result, ("add_address_entry", "add_tag"))
+                else:
+                    tag_action_result = ActionResult()
+                    status, response = self._make_rest_call(data, tag_action_result)
+                    if phantom.is_fail(status):
+                        action_result.update_summary({"add_address_entry": {"add_tag": response}})
+                        return action_result.set_status(phantom.APP_ERROR, tag_action_result.get_message()), None
 
-                connector.debug_print(f"Done adding {tag} tag...")
-                xml_tag_string += f"<member>{tag}</member>"
+                    self._add_created_tags(config_xpath, missing_tags)
+                    connector.debug_print(f"Done adding {missing_tags} tags...")
 
+            xml_tag_string += "".join(f"<member>{tag}</member>" for tag in tags)
             xml_tag_string += "</tag>"
 
         return phantom.APP_SUCCESS, xml_tag_string
@@ -1248,6 +2958,13 @@ class PanoramaUtils:
             if phantom.is_fail(status):
                 return action_result.get_status()
 
+            # Check the device groups against the cached device group inventory, before any config call
+            device_groups = [] if param[consts.PAN_JSON_DEVICE_GRP].lower() == consts.PAN_DEV_GRP_SHARED else [param[consts.PAN_JSON_DEVICE_GRP]]
+            device_groups.extend(value.strip() for value in (param.get(consts.PAN_JSON_DEVICE_GROUPS) or "").split(",") if value.strip())
+            unknown_device_groups = self._find_unknown_device_groups(device_groups) if device_groups else None
+            if unknown_device_groups:
+                return action_result.set_status(phantom.APP_ERROR, consts.PAN_ERROR_UNKNOWN_DEVICE_GROUPS.format(unknown_device_groups))
+
         # Validation for name parameter if present
         if param.get(consts.EDL_ADR_POLICY_NAME) or param.get(consts.PAN_JSON_POLICY_NAME):
             if param.get(consts.PAN_JSON_POLICY_NAME):
@@ -0,0 +1,185 @@
+# File: panorama_xml.py
+#
+# Copyright (c) 2016-2025 Splunk Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under
+# the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+# either express or implied. See the License for the specific language governing permissions
+# and limitations under the License.
+
+import xml.etree.ElementTree as ElementTree
+from collections import OrderedDict
+
+import xmltodict
+
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+
+
+# Entities are never resolved and the parser never reaches the network
+LXML_PARSER_OPTIONS = {"resolve_entities": False, "no_network": True, "huge_tree": True, "remove_comments": True, "remove_pis": True}
+
+
+def _push_data(item, key, data):
+    """Add the value under the key the way xmltodict does, repeated keys become lists"""
+    if item is None:
+        item = OrderedDict()
+
+    if key not in item:
+        item[key] = data
+    elif isinstance(item[key], list):
+        item[key].append(data)
+    else:
+        item[key] = [item[key], data]
+
+    return item
+
+
+def element_to_dict(element, skipped_elements=None):
+    """Convert the element to the same value xmltodict.parse produces for it
+
+    Attributes are prefixed with '@', the text of elements having attributes or children
+    is kept under '#text' and an empty element is converted to None.
+    """
+    item = OrderedDict((f"@{key}", value) for key, value in element.attrib.items()) or None
+
+    for child in element:
+        if skipped_elements and child in skipped_elements:
+            continue
+        item = _push_data(item, child.tag, element_to_dict(child, skipped_elements))
+
+    data = "".join([element.text or "", *(child.tail or "" for child in element)]).strip() or None
+
+    if item is None:
+        return data
+
+    if data:
+        item = _push_data(item, "#text", data)
+
+    return item
+
+
+def parse_xml(xml):
+    """Parse the XML document into the same dictionary xmltodict.parse returns
+
+    libxml2 (through lxml) is used when it is installed, xmltodict is the fallback.
+
+    :param xml: XML document as str or bytes
+    :return: dictionary of the document
+    """
+    if lxml_etree is None:
+        return xmltodict.parse(xml)
+
+    if isinstance(xml, str):
+        xml = xml.encode("utf-8")
+
+    root = lxml_etree.fromstring(xml, lxml_etree.XMLParser(**LXML_PARSER_OPTIONS))
+    return {root.tag: element_to_dict(root)}
+
+
+def iterparse(source):
+    """Return the start and end events of the document read from the file-like source"""
+    if lxml_etree is None:
+        return ElementTree.iterparse(source, events=("start", "end"))
+
+    return lxml_etree.iterparse(source, events=("start", "end"), **LXML_PARSER_OPTIONS)
+
+
+class ResponseStream:
+    """Incremental parser of an XML API response
+
+    The entries found at the given path (e.g. 'response/result/application/entry') are converted
+    and dropped from the tree one at a time, so only one entry is held in memory.
+    Everything else in the response makes the header, which is available before the first entry.
+    """
+
+    def __init__(self, source, entry_path):
+        self._events = iterparse(source)
+        self._entry_path = entry_path.split("/")
+        self._path = []
+        self._elements = []
+        self._root = None
+
+    def _start(self, element):
+        """Track the started element, return True if it is an entry"""
+        if self._root is None:
+            self._root = element
+
+        self._path.append(element.tag)
+        self._elements.append(element)
+        return self._path == self._entry_path
+
+    def _end(self):
+        """Track the ended element, return True if it is an entry"""
+        is_entry = self._path == self._entry_path
+        self._path.pop()
+        self._elements.pop()
+        return is_entry
+
+    def read_header(self):
+        """Parse the response up to its first entry
+
+        :return: response dictionary without the entries, None if the response is empty
+        """
+        skipped_elements = None
+
+        for event, element in self._events:
+            if event == "start":
+                if self._start(element):
+                    # The parser reads ahead, the next entries may already be attached to the tree
+                    skipped_elements = {child for child in self._elements[-2] if child.tag == element.tag}
+                    break
+            else:
+                self._end()
+
+        if self._root is None:
+            return None
+
+        return {self._root.tag: element_to_dict(self._root, skipped_elements)}
+
+    def entries(self):
+        """Yield the entry dictionaries one at a time, read_header must have been called first"""
+        for event, element in self._events:
+            if event == "start":
+                self._start(element)
+            elif self._end():
+                yield element_to_dict(element)
+                element.clear()
+                self._elements[-1].remove(element)
+
+
+class StreamedEntries:
+    """Entries of a streamed response, the connection is released once they are consumed or closed
+
+    The callers which may not consume the entries (e.g. on an error or an unfinished job) close them with 'with'.
+    """
+
+    def __init__(self, entries=(), close=None):
+        self._entries = entries
+        self._close = close
+
+    def __iter__(self):
+        try:
+            yield from self._entries
+        finally:
+            self.close()
+
+    def close(self):
+        if self._close is not None:
+            close, self._close = self._close, None
+            close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()